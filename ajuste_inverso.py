@@ -0,0 +1,413 @@
+"""Ajuste inverso: dimensiones y posiciones de elementos a partir de objetivos
+
+En lugar de despejar a mano (r = √(2A/π), centro = Cy - 4r/(3π), ...),
+se marcan parámetros de los elementos de una CentroidCalculator como
+libres y se piden valores objetivo de área, centroide o momentos de
+inercia centroidales, de la figura completa o de un subconjunto de
+elementos. InverseProblem resuelve por mínimos cuadrados no lineales
+(Levenberg-Marquardt) con jacobianos analíticos de las fórmulas de la
+figura compuesta.
+
+Todo está vectorizado sobre un eje de variantes: valores iniciales y
+objetivos pueden ser arreglos (B,) y las B variantes se resuelven juntas,
+con un sistema normal (B, P, P) por iteración.
+
+Parámetros por tipo de geometría (Shape.kind):
+    rectangle   center_x, center_y, width, height
+    circle      center_x, center_y, radius
+    semicircle  center_x, center_y, radius (la orientación queda fija)
+    polygon     x0, y0, x1, y1, ... (vértices)
+Los elementos sin geometría (add_custom_element) solo aportan valores fijos.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from centroide_fig_compuesta_v2 import CentroidCalculator, GeometricElement, Shape
+
+QUANTITIES = ('area', 'centroid_x', 'centroid_y', 'ix', 'iy', 'ixy')
+PARAMETERS = {
+    'rectangle': ('center_x', 'center_y', 'width', 'height'),
+    'circle': ('center_x', 'center_y', 'radius'),
+    'semicircle': ('center_x', 'center_y', 'radius'),
+}
+# Parámetros que deben seguir siendo positivos durante el ajuste
+_SIZES = ('width', 'height', 'radius')
+_SEMICIRCLE_PARALLEL = np.pi / 8 - 8 / (9 * np.pi)
+_SEMICIRCLE_NORMAL = np.pi / 8
+
+@dataclass
+class FitResult:
+    """Parámetros ajustados de las B variantes"""
+    names: List[str]           # 'elemento.parámetro' de cada columna de x
+    x: np.ndarray              # (B, P)
+    values: np.ndarray         # (B, K) cantidades obtenidas, en el orden de los objetivos
+    residuals: np.ndarray      # (B, K) valores - objetivos
+    converged: np.ndarray      # (B,) bool, todos los objetivos cumplidos
+    iterations: int
+
+def _from_centroid_form(area, cx, cy, jxx, jyy, jxy, d_area, d_cx, d_cy, d_jxx, d_jyy, d_jxy):
+    """Momentos respecto al origen (B, 6) y su jacobiano (B, 6, n)
+
+    Entradas: área, centroide y tensor centroidal (∫x², ∫y², ∫xy) (B,) con
+    sus derivadas (B, n) respecto a los parámetros del elemento.
+    """
+    moments = np.stack((area, area * cx, area * cy, area * cx * cx + jxx,
+                        area * cy * cy + jyy, area * cx * cy + jxy), axis=1)
+    a, x, y = area[:, None], cx[:, None], cy[:, None]
+    jacobian = np.stack((
+        d_area,
+        d_area * x + a * d_cx,
+        d_area * y + a * d_cy,
+        d_area * x * x + 2 * a * x * d_cx + d_jxx,
+        d_area * y * y + 2 * a * y * d_cy + d_jyy,
+        d_area * x * y + a * (d_cx * y + x * d_cy) + d_jxy,
+    ), axis=1)
+    return moments, jacobian
+
+def _rectangle(p):
+    cx, cy, w, h = p.T
+    zero, one = np.zeros_like(w), np.ones_like(w)
+    d = lambda *columns: np.stack(columns, axis=1)
+    return _from_centroid_form(
+        w * h, cx, cy, h * w**3 / 12, w * h**3 / 12, zero,
+        d(zero, zero, h, w), d(one, zero, zero, zero), d(zero, one, zero, zero),
+        d(zero, zero, h * w * w / 4, w**3 / 12), d(zero, zero, h**3 / 12, w * h * h / 4),
+        d(zero, zero, zero, zero))
+
+def _circle(p):
+    cx, cy, r = p.T
+    zero, one = np.zeros_like(r), np.ones_like(r)
+    d = lambda *columns: np.stack(columns, axis=1)
+    inertia = np.pi * r**4 / 4
+    d_inertia = d(zero, zero, np.pi * r**3)
+    return _from_centroid_form(
+        np.pi * r * r, cx, cy, inertia, inertia, zero,
+        d(zero, zero, 2 * np.pi * r), d(one, zero, zero), d(zero, one, zero),
+        d_inertia, d_inertia, d(zero, zero, zero))
+
+def _semicircle(p, angle):
+    cx, cy, r = p.T
+    zero, one = np.zeros_like(r), np.ones_like(r)
+    d = lambda *columns: np.stack(columns, axis=1)
+    ux, uy = np.cos(angle), np.sin(angle)
+    offset = 4 / (3 * np.pi)
+    # Tensor centroidal: k∥ r⁴ u uᵀ + k⊥ r⁴ v vᵀ, u hacia la parte curva y v ⟂ u
+    kxx = _SEMICIRCLE_PARALLEL * ux * ux + _SEMICIRCLE_NORMAL * uy * uy
+    kyy = _SEMICIRCLE_PARALLEL * uy * uy + _SEMICIRCLE_NORMAL * ux * ux
+    kxy = (_SEMICIRCLE_PARALLEL - _SEMICIRCLE_NORMAL) * ux * uy
+    r3, r4 = r**3, r**4
+    return _from_centroid_form(
+        np.pi * r * r / 2, cx + offset * r * ux, cy + offset * r * uy,
+        kxx * r4, kyy * r4, kxy * r4,
+        d(zero, zero, np.pi * r), d(one, zero, offset * ux * one),
+        d(zero, one, offset * uy * one),
+        d(zero, zero, 4 * kxx * r3), d(zero, zero, 4 * kyy * r3), d(zero, zero, 4 * kxy * r3))
+
+def _polygon(p):
+    """Momentos (orientación positiva) y jacobiano respecto a (x0, y0, x1, y1, ...)"""
+    x, y = p[:, 0::2], p[:, 1::2]
+    xn, yn = np.roll(x, -1, axis=1), np.roll(y, -1, axis=1)
+    c = x * yn - xn * y
+    qx = x * x + x * xn + xn * xn
+    qy = y * y + y * yn + yn * yn
+    s = x * yn + 2 * x * y + 2 * xn * yn + xn * y
+    terms = (c / 2, (x + xn) * c / 6, (y + yn) * c / 6, qx * c / 12, qy * c / 12, s * c / 24)
+    # Derivadas de cada término de arista respecto a (x_i, y_i, x_i+1, y_i+1)
+    partials = (
+        (yn / 2, -xn / 2, -y / 2, x / 2),
+        ((c + (x + xn) * yn) / 6, -(x + xn) * xn / 6, (c - (x + xn) * y) / 6, (x + xn) * x / 6),
+        ((y + yn) * yn / 6, (c - (y + yn) * xn) / 6, -(y + yn) * y / 6, (c + (y + yn) * x) / 6),
+        (((2 * x + xn) * c + qx * yn) / 12, -qx * xn / 12,
+         ((x + 2 * xn) * c - qx * y) / 12, qx * x / 12),
+        (qy * yn / 12, ((2 * y + yn) * c - qy * xn) / 12,
+         -qy * y / 12, ((y + 2 * yn) * c + qy * x) / 12),
+        (((yn + 2 * y) * c + s * yn) / 24, ((2 * x + xn) * c - s * xn) / 24,
+         ((2 * yn + y) * c - s * y) / 24, ((x + 2 * xn) * c + s * x) / 24),
+    )
+    moments = np.stack([t.sum(axis=1) for t in terms], axis=1)
+    jacobian = np.empty((len(p), 6, p.shape[1]))
+    for k, (dxi, dyi, dxn, dyn) in enumerate(partials):
+        # El vértice j es el inicio de la arista j y el final de la arista j-1
+        jacobian[:, k, 0::2] = dxi + np.roll(dxn, 1, axis=1)
+        jacobian[:, k, 1::2] = dyi + np.roll(dyn, 1, axis=1)
+    orientation = np.where(moments[:, 0] < 0, -1.0, 1.0)
+    return moments * orientation[:, None], jacobian * orientation[:, None, None]
+
+@dataclass
+class _Element:
+    name: str
+    kind: Optional[str]
+    sign: float
+    values: np.ndarray          # parámetros iniciales
+    names: Tuple[str, ...]
+    angle: float = 0.0
+    fixed: Optional[np.ndarray] = None   # momentos de un elemento sin geometría
+
+    def moments(self, p: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.kind == 'rectangle':
+            m, j = _rectangle(p)
+        elif self.kind == 'circle':
+            m, j = _circle(p)
+        elif self.kind == 'semicircle':
+            m, j = _semicircle(p, self.angle)
+        elif self.kind == 'polygon':
+            m, j = _polygon(p)
+        else:
+            return np.broadcast_to(self.fixed, (len(p), 6)), np.zeros((len(p), 6, 0))
+        return self.sign * m, self.sign * j
+
+def _element_from(element: GeometricElement) -> _Element:
+    sign = 1.0 if element.is_positive else -1.0
+    shape = element.shape
+    if shape is None:
+        a = element.area
+        fixed = sign * np.array([a, a * element.centroid_x, a * element.centroid_y,
+                                 a * element.centroid_x**2 + element.iy,
+                                 a * element.centroid_y**2 + element.ix,
+                                 a * element.centroid_x * element.centroid_y + element.ixy])
+        return _Element(element.name, None, sign, np.zeros(0), (), fixed=fixed)
+    params = np.asarray(shape.params, dtype=float)
+    if shape.kind == 'polygon':
+        n = len(params.reshape(-1, 2))
+        names = tuple(f"{axis}{k}" for k in range(n) for axis in 'xy')
+        return _Element(element.name, 'polygon', sign, params.ravel().copy(), names)
+    if shape.kind == 'semicircle':
+        return _Element(element.name, 'semicircle', sign, params[:3].copy(),
+                        PARAMETERS['semicircle'], angle=float(params[3]))
+    return _Element(element.name, shape.kind, sign, params.copy(), PARAMETERS[shape.kind])
+
+def _quantities(moments: np.ndarray, jacobian: np.ndarray, which: Sequence[str]
+                ) -> Tuple[np.ndarray, np.ndarray]:
+    """Cantidades (B, K) y jacobiano (B, K, P) a partir de los momentos totales"""
+    a, sx, sy, sxx, syy, sxy = moments.T
+    da, dsx, dsy, dsxx, dsyy, dsxy = np.moveaxis(jacobian, 1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cx, cy = sx / a, sy / a
+    x, y = cx[:, None], cy[:, None]
+    table = {
+        'area': (a, da),
+        'centroid_x': (cx, (dsx - x * da) / a[:, None]),
+        'centroid_y': (cy, (dsy - y * da) / a[:, None]),
+        'ix': (syy - sy * cy, dsyy - 2 * y * dsy + y * y * da),
+        'iy': (sxx - sx * cx, dsxx - 2 * x * dsx + x * x * da),
+        'ixy': (sxy - sx * cy, dsxy - y * dsx - x * dsy + x * y * da),
+    }
+    values = np.stack([table[q][0] for q in which], axis=1)
+    return values, np.stack([table[q][1] for q in which], axis=1)
+
+class InverseProblem:
+    """Parámetros libres de una figura y objetivos a cumplir"""
+
+    def __init__(self, calc: CentroidCalculator):
+        self.elements = [_element_from(element) for element in calc.elements]
+        self._free: List[Tuple[int, int]] = []          # (elemento, parámetro)
+        self._initial: List[np.ndarray] = []
+        self._targets: List[Tuple[str, np.ndarray, Optional[Tuple[int, ...]], float]] = []
+
+    def _element_index(self, name: str) -> int:
+        matches = [i for i, element in enumerate(self.elements) if element.name == name]
+        if not matches:
+            raise KeyError(f"No existe el elemento '{name}'.")
+        if len(matches) > 1:
+            raise ValueError(f"Hay varios elementos llamados '{name}'.")
+        return matches[0]
+
+    @property
+    def names(self) -> List[str]:
+        return [f"{self.elements[e].name}.{self.elements[e].names[k]}" for e, k in self._free]
+
+    def free(self, element: str, *parameters: str, initial=None) -> 'InverseProblem':
+        """Marca parámetros de un elemento como variables
+
+        initial: valores iniciales (uno por parámetro, escalares o arreglos (B,));
+            por defecto los valores actuales del elemento
+        """
+        e = self._element_index(element)
+        available = self.elements[e].names
+        if not parameters:
+            parameters = available
+        if initial is not None and len(initial) != len(parameters):
+            raise ValueError("Se necesita un valor inicial por parámetro.")
+        for i, parameter in enumerate(parameters):
+            if parameter not in available:
+                raise ValueError(f"'{element}' no tiene el parámetro '{parameter}' "
+                                 f"(disponibles: {', '.join(available) or 'ninguno'}).")
+            k = available.index(parameter)
+            if (e, k) in self._free:
+                continue
+            self._free.append((e, k))
+            value = self.elements[e].values[k] if initial is None else initial[i]
+            self._initial.append(np.asarray(value, dtype=float))
+        return self
+
+    def target(self, quantity: str, value, elements: Optional[Sequence[str]] = None,
+               weight: float = 1.0) -> 'InverseProblem':
+        """Agrega un objetivo sobre la figura completa o sobre `elements`
+
+        quantity: una de QUANTITIES (ix, iy, ixy centroidales, como SectionProperties);
+            el área es con signo, así que un hueco aislado tiene área negativa
+        value: escalar o arreglo (B,) con un objetivo por variante
+        El residuo se escala por weight / max(|value|, 1) para mezclar unidades.
+        """
+        if quantity not in QUANTITIES:
+            raise ValueError(f"Cantidad desconocida: {quantity} "
+                             f"(opciones: {', '.join(QUANTITIES)})")
+        subset = None if elements is None else tuple(sorted(self._element_index(name)
+                                                            for name in elements))
+        self._targets.append((quantity, np.asarray(value, dtype=float), subset, weight))
+        return self
+
+    def _batch_size(self) -> int:
+        shapes = [v.shape for v in self._initial] + [t[1].shape for t in self._targets]
+        return int(np.prod(np.broadcast_shapes((), *shapes)))
+
+    def initial(self) -> np.ndarray:
+        """Valores iniciales (B, P)"""
+        b = self._batch_size()
+        if not self._initial:
+            return np.zeros((b, 0))
+        return np.stack([np.broadcast_to(v, (b,)) for v in self._initial], axis=1).astype(float)
+
+    def evaluate(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cantidades objetivo (B, K) y su jacobiano (B, K, P) en los parámetros x (B, P)"""
+        x = np.atleast_2d(x)
+        b, n_free = x.shape
+        moments, jacobians = [], []
+        for e, element in enumerate(self.elements):
+            columns = [(i, k) for i, (fe, k) in enumerate(self._free) if fe == e]
+            if not columns:
+                # Elemento fijo: mismos momentos en todas las variantes
+                m, _ = element.moments(np.asarray(element.values)[None])
+                moments.append(np.broadcast_to(m, (b, 6)))
+                jacobians.append(np.broadcast_to(0.0, (b, 6, n_free)))
+                continue
+            params = np.broadcast_to(element.values, (b, len(element.values))).copy()
+            for i, k in columns:
+                params[:, k] = x[:, i]
+            m, j = element.moments(params)
+            full = np.zeros((b, 6, n_free))
+            for i, k in columns:
+                full[:, :, i] = j[:, :, k]
+            moments.append(m)
+            jacobians.append(full)
+        moments, jacobians = np.stack(moments, axis=1), np.stack(jacobians, axis=1)
+
+        values, jacobian = [], []
+        for quantity, _, subset, _ in self._targets:
+            index = slice(None) if subset is None else list(subset)
+            v, j = _quantities(moments[:, index].sum(axis=1), jacobians[:, index].sum(axis=1),
+                               (quantity,))
+            values.append(v)
+            jacobian.append(j)
+        if not values:
+            return np.zeros((b, 0)), np.zeros((b, 0, n_free))
+        return np.concatenate(values, axis=1), np.concatenate(jacobian, axis=1)
+
+    def _goals(self, b: int) -> Tuple[np.ndarray, np.ndarray]:
+        goals = np.stack([np.broadcast_to(t[1], (b,)) for t in self._targets], axis=1)
+        scale = np.stack([t[3] / np.maximum(np.abs(np.broadcast_to(t[1], (b,))), 1.0)
+                          for t in self._targets], axis=1)
+        return goals, scale
+
+    def solve(self, x0=None, tol: float = 1e-10, max_iter: int = 100) -> FitResult:
+        """Levenberg-Marquardt por lotes sobre todas las variantes
+
+        tol: residuo escalado máximo para dar un objetivo por cumplido; el
+            ajuste de una variante también se detiene si su paso relativo es
+            menor que tol (mejor aproximación de objetivos incompatibles)
+        Los parámetros de tamaño (ancho, alto, radio) se mantienen positivos.
+        """
+        if not self._free:
+            raise ValueError("No hay parámetros libres.")
+        if not self._targets:
+            raise ValueError("No hay objetivos.")
+        x = self.initial() if x0 is None else np.array(np.atleast_2d(x0), dtype=float)
+        b = len(x)
+        goals, scale = self._goals(b)
+        positive = np.array([self.elements[e].names[k] in _SIZES for e, k in self._free])
+
+        def residuals(xs, rows):
+            values, jacobian = self.evaluate(xs)
+            return values, (values - goals[rows]) * scale[rows], jacobian * scale[rows][:, :, None]
+
+        values, r, jac = residuals(x, np.arange(b))
+        cost = (r * r).sum(axis=1)
+        damping = np.full(b, 1e-3)
+        met = lambda rows: np.abs(r[rows]).max(axis=1) <= tol
+        done = met(slice(None))
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            rows = np.flatnonzero(~done)
+            if not len(rows):
+                break
+            jr, rr = jac[rows], r[rows]
+            normal = np.einsum('bki,bkj->bij', jr, jr)
+            gradient = np.einsum('bki,bk->bi', jr, rr)
+            diagonal = np.einsum('bii->bi', normal)
+            # Amortiguamiento de Marquardt: escala con la diagonal de JᵀJ
+            system = normal + np.einsum('b,bi,ij->bij', damping[rows],
+                                        diagonal + 1e-30, np.eye(normal.shape[1]))
+            step = -np.linalg.solve(system, gradient[:, :, None])[:, :, 0]
+            # Un tamaño no baja de golpe de la décima parte de su valor actual
+            trial = np.where(positive, np.maximum(x[rows] + step, x[rows] / 10), x[rows] + step)
+            t_values, t_r, t_jac = residuals(trial, rows)
+            t_cost = (t_r * t_r).sum(axis=1)
+            better = t_cost < cost[rows]
+            stalled = (np.abs(trial - x[rows]) <= tol * (np.abs(x[rows]) + tol)).all(axis=1)
+            accepted = rows[better]
+            x[accepted], values[accepted] = trial[better], t_values[better]
+            r[accepted], jac[accepted], cost[accepted] = t_r[better], t_jac[better], t_cost[better]
+            damping[rows] = np.where(better, damping[rows] * 0.3, damping[rows] * 10)
+            done[rows] = met(rows) | (better & stalled) | (damping[rows] > 1e16)
+        return FitResult(self.names, x, values, values - goals, met(slice(None)), iterations)
+
+    def apply(self, x: Sequence[float]) -> CentroidCalculator:
+        """Nueva CentroidCalculator con los parámetros libres de una variante"""
+        x = np.asarray(x, dtype=float).ravel()
+        calc = CentroidCalculator()
+        for e, element in enumerate(self.elements):
+            params = element.values.copy()
+            for i, (fe, k) in enumerate(self._free):
+                if fe == e:
+                    params[k] = x[i]
+            if element.kind is None:
+                a, sx, sy, sxx, syy, sxy = element.fixed * element.sign
+                cx, cy = sx / a, sy / a
+                calc.add_element(GeometricElement(element.name, a, cx, cy, element.sign > 0,
+                                                  syy - a * cy * cy, sxx - a * cx * cx,
+                                                  sxy - a * cx * cy))
+                continue
+            m = element.moments(params[None])[0][0] * element.sign
+            a, sx, sy, sxx, syy, sxy = m
+            cx, cy = sx / a, sy / a
+            if element.kind == 'polygon':
+                shape = Shape('polygon', params.reshape(-1, 2))
+            elif element.kind == 'semicircle':
+                shape = Shape('semicircle', np.append(params, element.angle))
+            else:
+                shape = Shape(element.kind, params)
+            calc.add_element(GeometricElement(element.name, a, cx, cy, element.sign > 0,
+                                              syy - a * cy * cy, sxx - a * cx * cx,
+                                              sxy - a * cx * cy, shape))
+        return calc
+
+if __name__ == "__main__":
+    from centroide_fig_compuesta_v2 import ejemplo_figura_con_calculo_automatico
+
+    # Los despejes a mano del ejemplo: radio y centro del semicírculo a partir de
+    # su área y su centroide, y radios de los círculos a partir de sus áreas
+    problem = InverseProblem(ejemplo_figura_con_calculo_automatico())
+    problem.free("SEMICIRCUNFERENCIA", "radius", "center_y", initial=(10.0, 130.0))
+    problem.free("CIR_MAY", "radius", initial=(10.0,))
+    problem.free("CIR_MENOR", "radius", initial=(5.0,))
+    problem.target('area', 353.43, ["SEMICIRCUNFERENCIA"])
+    problem.target('centroid_y', 144.77, ["SEMICIRCUNFERENCIA"])
+    # Los círculos son huecos: su área con signo es negativa
+    problem.target('area', -1963.5, ["CIR_MAY"])
+    problem.target('area', -201.06, ["CIR_MENOR"])
+    result = problem.solve()
+    for name, value in zip(result.names, result.x[0]):
+        print(f"{name:<30} {value:10.4f}")
+    print("Centroide de la figura:", problem.apply(result.x[0]).calculate_centroid())
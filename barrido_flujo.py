@@ -0,0 +1,294 @@
+"""Barridos de parámetros para los experimentos de verificación del flujo
+
+Un barrido recorre el producto cartesiano de posiciones de la carga,
+radios de la superficie y resolución de la integración, y mide para cada
+caso el flujo, el error contra la referencia y el costo:
+
+    circulo  flujo_circulo de demostraciones.py (suma de Riemann con
+             n_points); la referencia es la misma suma con REFERENCE_POINTS
+    esfera   flujo_gauss.gauss_flux sobre una esfera con tolerancia tol; la
+             referencia es la ley de Gauss (4πq dentro, 0 fuera, 2πq sobre
+             la superficie)
+
+Los casos se numeran en el orden del producto y se reparten en bloques de
+chunk_size entre los procesos de un ProcessPoolExecutor. Cada bloque
+terminado se agrega de inmediato como líneas JSON al archivo de salida, así
+que un barrido interrumpido se retoma con la misma orden: las líneas
+completas se conservan, una última línea cortada se descarta y solo se
+calculan los casos que faltan. Junto a la salida se guarda la rejilla
+(<salida>.grid.json) para no mezclar barridos distintos.
+
+    python barrido_flujo.py run salida.jsonl --qx=-4:4:101 --qy 0 --radius 1:3:5 \\
+        --n-points 16 64 256 1024
+    python barrido_flujo.py report salida.jsonl
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+METHODS = {
+    'circulo': ('qx', 'qy', 'radius', 'n_points'),
+    'esfera': ('qx', 'qy', 'radius', 'tol'),
+}
+# Columna de resolución de cada método, para agrupar el informe de error contra costo
+RESOLUTION = {'circulo': 'n_points', 'esfera': 'tol'}
+REFERENCE_POINTS = 2**15
+DEFAULT_CHUNK_SIZE = 256
+
+@dataclass(frozen=True)
+class SweepGrid:
+    """Producto cartesiano de valores por parámetro para un método"""
+    method: str
+    axes: Tuple[Tuple[str, Tuple[float, ...]], ...]
+
+    @classmethod
+    def from_values(cls, method: str, **values) -> 'SweepGrid':
+        if method not in METHODS:
+            raise ValueError(f"Método desconocido: {method}")
+        names = METHODS[method]
+        unknown = set(values) - set(names)
+        if unknown:
+            raise ValueError(f"Parámetros no válidos para '{method}': "
+                             f"{', '.join(sorted(unknown))}")
+        missing = [name for name in names if name not in values]
+        if missing:
+            raise ValueError(f"Faltan valores para: {', '.join(missing)}")
+        axes = tuple((name, tuple(np.atleast_1d(values[name]).tolist())) for name in names)
+        if any(not axis for _, axis in axes):
+            raise ValueError("Cada parámetro necesita al menos un valor.")
+        return cls(method, axes)
+
+    def __len__(self) -> int:
+        return int(np.prod([len(axis) for _, axis in self.axes]))
+
+    def case(self, index: int) -> Dict[str, float]:
+        """Parámetros del caso `index` (orden de itertools.product)"""
+        params = {}
+        for name, axis in reversed(self.axes):
+            index, k = divmod(index, len(axis))
+            params[name] = axis[k]
+        return {name: params[name] for name, _ in self.axes}
+
+    def to_json(self) -> dict:
+        return {'method': self.method, 'axes': {name: list(axis) for name, axis in self.axes}}
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'SweepGrid':
+        return cls.from_values(data['method'], **data['axes'])
+
+@dataclass
+class SweepSummary:
+    """Resultado de run_sweep"""
+    total: int
+    already_done: int
+    computed: int
+    seconds: float
+
+@lru_cache(maxsize=4096)
+def _circle_reference(qx: float, qy: float, radius: float) -> float:
+    import demostraciones
+    return float(demostraciones.flujo_circulo(qx, qy, radius, REFERENCE_POINTS))
+
+def run_case(method: str, params: Dict[str, float]) -> Dict[str, float]:
+    """Flujo, referencia, error y costo (evaluaciones del campo) de un caso"""
+    start = time.perf_counter()
+    if method == 'circulo':
+        import demostraciones
+        n_points = int(params['n_points'])
+        flux = float(demostraciones.flujo_circulo(params['qx'], params['qy'],
+                                                  params['radius'], n_points))
+        cost = n_points
+        reference = _circle_reference(params['qx'], params['qy'], params['radius'])
+    else:
+        from flujo_gauss import Sphere, gauss_flux
+        result = gauss_flux(Sphere(radius=params['radius']), [(params['qx'], params['qy'], 0.0)],
+                            tol=params['tol'])
+        flux, cost = result.flux, result.n_evaluations
+        distance = np.hypot(params['qx'], params['qy'])
+        # Sobre la superficie el valor principal es la mitad: 2πq
+        reference = 4 * np.pi * ((distance < params['radius'])
+                                 + 0.5 * (distance == params['radius']))
+    seconds = time.perf_counter() - start
+    return {'flux': flux, 'reference': reference, 'error': abs(flux - reference),
+            'cost': cost, 'seconds': seconds}
+
+def _run_chunk(grid: SweepGrid, ids: List[int]) -> List[str]:
+    """Se ejecuta en un proceso del pool: líneas JSON de los casos del bloque"""
+    lines = []
+    for index in ids:
+        params = grid.case(index)
+        row = {'id': index, **params, **run_case(grid.method, params)}
+        lines.append(json.dumps(row) + "\n")
+    return lines
+
+def _grid_path(path: Path) -> Path:
+    return path.with_name(path.name + '.grid.json')
+
+def recover(path) -> Set[int]:
+    """Ids ya calculados en `path`; descarta una última línea incompleta"""
+    path = Path(path)
+    if not path.exists():
+        return set()
+    done = set()
+    good_bytes = 0
+    with open(path, 'rb') as fh:
+        for line in fh:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(int(json.loads(line)['id']))
+            except (ValueError, KeyError):
+                break
+            good_bytes += len(line)
+    if good_bytes < path.stat().st_size:
+        with open(path, 'r+b') as fh:
+            fh.truncate(good_bytes)
+    return done
+
+def _chunks(ids: Sequence[int], chunk_size: int) -> Iterator[List[int]]:
+    for start in range(0, len(ids), chunk_size):
+        yield list(ids[start:start + chunk_size])
+
+def run_sweep(grid: SweepGrid, path, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              max_workers: Optional[int] = None, progress: bool = False) -> SweepSummary:
+    """Calcula los casos de `grid` que falten en `path` (JSON lines)
+
+    Los bloques terminados se escriben en cuanto llegan, en orden de llegada.
+    Se mantienen a lo sumo dos bloques pendientes por proceso.
+    """
+    path = Path(path)
+    grid_path = _grid_path(path)
+    if grid_path.exists():
+        with open(grid_path, encoding='utf-8') as fh:
+            if SweepGrid.from_json(json.load(fh)) != grid:
+                raise ValueError(f"{path} pertenece a otro barrido ({grid_path}).")
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(grid_path, 'w', encoding='utf-8') as fh:
+            json.dump(grid.to_json(), fh, indent=2)
+
+    start = time.perf_counter()
+    done = recover(path)
+    pending = [i for i in range(len(grid)) if i not in done]
+    summary = SweepSummary(len(grid), len(done), 0, 0.0)
+    if not pending:
+        return summary
+
+    tasks = _chunks(pending, chunk_size)
+    context = multiprocessing.get_context('spawn')
+    workers = min(max_workers or os.cpu_count() or 1, -(-len(pending) // chunk_size))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, \
+            open(path, 'a', encoding='utf-8') as fh:
+        running = set()
+        for ids in itertools.islice(tasks, 2 * workers):
+            running.add(pool.submit(_run_chunk, grid, ids))
+        while running:
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                lines = future.result()
+                fh.write(''.join(lines))
+                fh.flush()
+                summary.computed += len(lines)
+                next_ids = next(tasks, None)
+                if next_ids is not None:
+                    running.add(pool.submit(_run_chunk, grid, next_ids))
+            if progress:
+                print(f"\r{summary.already_done + summary.computed}/{summary.total} casos",
+                      end='', flush=True)
+    if progress:
+        print()
+    summary.seconds = time.perf_counter() - start
+    return summary
+
+def load_results(path) -> List[dict]:
+    """Filas completas de un archivo de barrido"""
+    rows = []
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            if line.endswith("\n"):
+                rows.append(json.loads(line))
+    return rows
+
+def error_vs_cost(rows: Sequence[dict], resolution: str) -> List[dict]:
+    """Error (mediana, p90, máximo) y costo medio agrupados por resolución"""
+    groups: Dict[float, List[dict]] = {}
+    for row in rows:
+        groups.setdefault(row[resolution], []).append(row)
+    report = []
+    for value in sorted(groups):
+        group = groups[value]
+        errors = np.array([row['error'] for row in group])
+        report.append({
+            resolution: value,
+            'cases': len(group),
+            'error_p50': float(np.median(errors)),
+            'error_p90': float(np.percentile(errors, 90)),
+            'error_max': float(errors.max()),
+            'cost_mean': float(np.mean([row['cost'] for row in group])),
+            'seconds_mean': float(np.mean([row['seconds'] for row in group])),
+        })
+    return report
+
+def _values(spec: Sequence[str]) -> List[float]:
+    """Valores de un parámetro: números sueltos o rangos inicio:fin:cantidad"""
+    values: List[float] = []
+    for item in spec:
+        if ':' in item:
+            start, stop, count = item.split(':')
+            values.extend(np.linspace(float(start), float(stop), int(count)).tolist())
+        else:
+            values.append(float(item))
+    return values
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="calcular (o retomar) un barrido")
+    run_parser.add_argument('output', help="archivo JSON lines de resultados")
+    run_parser.add_argument('--method', choices=METHODS, default='circulo')
+    run_parser.add_argument('--qx', nargs='+', default=['3.5', '0'])
+    run_parser.add_argument('--qy', nargs='+', default=['0'])
+    run_parser.add_argument('--radius', nargs='+', default=['2'])
+    run_parser.add_argument('--n-points', nargs='+', default=['1000'],
+                            help="muestras de la suma de Riemann (método circulo)")
+    run_parser.add_argument('--tol', nargs='+', default=['1e-8'],
+                            help="tolerancia de la cuadratura (método esfera)")
+    run_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    run_parser.add_argument('--jobs', type=int, default=None, help="procesos del pool")
+    report_parser = commands.add_parser('report', help="error contra costo")
+    report_parser.add_argument('output')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        names = METHODS[args.method]
+        specs = {'qx': args.qx, 'qy': args.qy, 'radius': args.radius,
+                 'n_points': args.n_points, 'tol': args.tol}
+        grid = SweepGrid.from_values(args.method, **{name: _values(specs[name])
+                                                     for name in names})
+        summary = run_sweep(grid, args.output, args.chunk_size, args.jobs, progress=True)
+        print(f"{summary.computed} casos calculados en {summary.seconds:.1f} s "
+              f"({summary.already_done} ya estaban de antes, {summary.total} en total)")
+
+    path = Path(args.output)
+    with open(_grid_path(path), encoding='utf-8') as fh:
+        grid = SweepGrid.from_json(json.load(fh))
+    resolution = RESOLUTION[grid.method]
+    print(f"{resolution:>10} {'casos':>7} {'error p50':>12} {'error p90':>12} "
+          f"{'error máx':>12} {'costo':>10} {'s/caso':>10}")
+    for row in error_vs_cost(load_results(path), resolution):
+        print(f"{row[resolution]:>10g} {row['cases']:>7} {row['error_p50']:>12.3e} "
+              f"{row['error_p90']:>12.3e} {row['error_max']:>12.3e} "
+              f"{row['cost_mean']:>10.0f} {row['seconds_mean']:>10.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""Banco de pruebas de rendimiento con historial y detección de regresiones
+
+Cada caso se mide para varios tamaños (elementos, cargas o muestras) con
+datos generados por una semilla fija, sin red ni archivos externos. Por
+caso y tamaño se registran latencias (p50, p90, p99), rendimiento
+(elementos por segundo a la mediana) y memoria pico (tracemalloc, que
+también ve las asignaciones de NumPy). Cada ejecución se agrega a un
+historial JSON; `compare` contrasta dos ejecuciones y marca regresiones.
+
+    python benchmarks.py run                        # tamaños hasta 10^4
+    python benchmarks.py run --max-size 1000000     # tamaños completos
+    python benchmarks.py run --filter centroide
+    python benchmarks.py compare --threshold 0.1    # última contra penúltima
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+HISTORY = 'benchmarks_history.json'
+DEFAULT_MAX_SIZE = 10**4
+ELEMENT_SIZES = tuple(10**k for k in range(1, 7))
+SAMPLE_SIZES = tuple(10**k for k in range(2, 7))
+# Puntos de evaluación fijos para los casos que escalan con las cargas
+FIELD_POINTS = 256
+
+@dataclass
+class Case:
+    """Un caso medible: setup(tamaño, rng) devuelve (función sin argumentos, elementos)"""
+    name: str
+    sizes: Tuple[int, ...]
+    setup: Callable[[int, np.random.Generator], Tuple[Callable[[], object], int]]
+
+def _random_elements(n, rng):
+    areas = rng.uniform(1.0, 10.0, n)
+    cx = rng.uniform(-10.0, 10.0, n)
+    cy = rng.uniform(-10.0, 10.0, n)
+    positive = rng.random(n) < 0.8
+    names = [f"E{i}" for i in range(n)]
+    return names, areas, cx, cy, positive
+
+def _filled_calculator(n, rng):
+    from centroide_fig_compuesta_v2 import CentroidCalculator
+    calc = CentroidCalculator()
+    calc.add_many(*_random_elements(n, rng))
+    return calc
+
+def _setup_add_many(n, rng):
+    from centroide_fig_compuesta_v2 import CentroidCalculator
+    data = _random_elements(n, rng)
+
+    def run():
+        CentroidCalculator().add_many(*data)
+    return run, n
+
+def _setup_add_element(n, rng):
+    from centroide_fig_compuesta_v2 import CentroidCalculator, GeometricElement
+    names, areas, cx, cy, positive = _random_elements(n, rng)
+    elements = [GeometricElement(*row) for row in zip(names, areas.tolist(), cx.tolist(),
+                                                      cy.tolist(), positive.tolist())]
+
+    def run():
+        calc = CentroidCalculator()
+        for element in elements:
+            calc.add_element(element)
+    return run, n
+
+def _setup_centroid(n, rng):
+    return _filled_calculator(n, rng).calculate_centroid, 1
+
+def _setup_section(n, rng):
+    return _filled_calculator(n, rng).calculate_section_properties, n
+
+def _setup_summary(n, rng):
+    return _filled_calculator(n, rng).get_summary_table, n
+
+def _setup_field(n, rng):
+    import campo_cargas
+    positions = rng.uniform(-1.0, 1.0, (n, 3))
+    charges = rng.choice([-1.0, 1.0], n)
+    points = rng.uniform(-2.0, 2.0, (FIELD_POINTS, 3))
+
+    def run():
+        campo_cargas.electric_field(points, positions, charges)
+    return run, n * FIELD_POINTS
+
+def _setup_flux(n, rng):
+    import demostraciones
+
+    def run():
+        demostraciones.flujo_circulo(*demostraciones.Q_FUERA, n_points=n)
+    return run, n
+
+def _drawing_rows(n, rng):
+    """n entidades en una grilla: rectángulos, polilíneas con arcos, agujeros y triángulos"""
+    side = int(np.ceil(np.sqrt(n)))
+    x0 = 4.0 * (np.arange(n) % side)
+    y0 = 4.0 * (np.arange(n) // side)
+    size = rng.uniform(1.0, 3.0, n)
+    return zip((np.arange(n) % 4).tolist(), x0.tolist(), y0.tolist(), size.tolist())
+
+def _write_dxf(path, n, rng):
+    with open(path, 'w') as fh:
+        fh.write("0\nSECTION\n2\nENTITIES\n")
+        for kind, x, y, s in _drawing_rows(n, rng):
+            if kind == 0:
+                fh.write(f"0\nLWPOLYLINE\n8\n0\n90\n4\n70\n1\n10\n{x}\n20\n{y}\n"
+                         f"10\n{x + s}\n20\n{y}\n10\n{x + s}\n20\n{y + s}\n"
+                         f"10\n{x}\n20\n{y + s}\n")
+            elif kind == 1:
+                fh.write(f"0\nLWPOLYLINE\n8\n0\n90\n2\n70\n1\n10\n{x}\n20\n{y}\n"
+                         f"42\n0.5\n10\n{x + s}\n20\n{y}\n42\n0.5\n")
+            elif kind == 2:
+                fh.write(f"0\nCIRCLE\n8\nHOLES\n10\n{x}\n20\n{y}\n40\n{s / 4}\n")
+            else:
+                for a, b in (((x, y), (x + s, y)), ((x + s, y), (x, y + s)),
+                             ((x, y + s), (x, y))):
+                    fh.write(f"0\nLINE\n8\n0\n10\n{a[0]}\n20\n{a[1]}\n"
+                             f"11\n{b[0]}\n21\n{b[1]}\n")
+        fh.write("0\nENDSEC\n0\nEOF\n")
+
+def _write_svg(path, n, rng):
+    with open(path, 'w') as fh:
+        fh.write('<svg xmlns="http://www.w3.org/2000/svg">\n<g id="piezas">\n')
+        for kind, x, y, s in _drawing_rows(n, rng):
+            if kind == 0:
+                fh.write(f'<rect x="{x}" y="{y}" width="{s}" height="{s}"/>\n')
+            elif kind == 1:
+                fh.write(f'<path d="M{x},{y} h{s} a{s / 2},{s / 2} 0 0 1 {-s},0 z"/>\n')
+            elif kind == 2:
+                fh.write(f'<path d="M{x},{y} C{x + s},{y} {x + s},{y + s} {x},{y + s} z '
+                         f'M{x + s / 4},{y + s / 4} v{s / 2} h{s / 8} z"/>\n')
+            else:
+                fh.write(f'<g id="HOLES"><circle cx="{x}" cy="{y}" r="{s / 4}"/></g>\n')
+        fh.write('</g>\n</svg>\n')
+
+def _setup_import(writer, suffix):
+    def setup(n, rng):
+        import tempfile
+        from importar_cad import import_drawing
+        tmp = tempfile.TemporaryDirectory()
+        path = Path(tmp.name) / f"dibujo{suffix}"
+        writer(path, n, rng)
+
+        def run(tmp=tmp):
+            import_drawing(path, hole_layers={'HOLES'})
+        return run, n
+    return setup
+
+CASES = [
+    Case('centroide.add_many', ELEMENT_SIZES, _setup_add_many),
+    Case('centroide.add_element', ELEMENT_SIZES[:5], _setup_add_element),
+    Case('centroide.calculate_centroid', ELEMENT_SIZES, _setup_centroid),
+    Case('centroide.section_properties', ELEMENT_SIZES, _setup_section),
+    Case('centroide.summary_table', ELEMENT_SIZES[:5], _setup_summary),
+    Case('campo.electric_field', ELEMENT_SIZES, _setup_field),
+    Case('flujo.circulo', SAMPLE_SIZES, _setup_flux),
+    Case('importar.dxf', ELEMENT_SIZES[:5], _setup_import(_write_dxf, '.dxf')),
+    Case('importar.svg', ELEMENT_SIZES[:5], _setup_import(_write_svg, '.svg')),
+]
+
+def measure(run: Callable[[], object], items: int, min_repeat: int = 5,
+            max_repeat: int = 100, min_time: float = 0.5) -> Dict[str, float]:
+    """Latencias de varias repeticiones (tras un calentamiento) y memoria pico"""
+    run()
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < max_repeat:
+        t0 = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - t0)
+        if len(latencies) >= min_repeat and time.perf_counter() - start >= min_time:
+            break
+    # La memoria se mide aparte: tracemalloc frena la ejecución
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        'items': items,
+        'repeat': len(latencies),
+        'p50': float(p50),
+        'p90': float(p90),
+        'p99': float(p99),
+        'mean': float(np.mean(latencies)),
+        'throughput': items / p50 if p50 > 0 else float('inf'),
+        'peak_bytes': int(peak),
+    }
+
+def run_benchmarks(pattern: str = '', max_size: int = DEFAULT_MAX_SIZE, seed: int = 0,
+                   verbose: bool = True) -> Dict[str, Dict[str, float]]:
+    """Ejecuta los casos cuyo nombre contiene `pattern`, hasta el tamaño dado"""
+    results = {}
+    for case in CASES:
+        if pattern not in case.name:
+            continue
+        for size in case.sizes:
+            if size > max_size:
+                continue
+            run, items = case.setup(size, np.random.default_rng(seed))
+            key = f"{case.name}[{size}]"
+            results[key] = measure(run, items)
+            if verbose:
+                r = results[key]
+                print(f"{key:<40} p50 {r['p50'] * 1e3:10.3f} ms  p99 {r['p99'] * 1e3:10.3f} ms  "
+                      f"{r['throughput']:12.3g}/s  pico {r['peak_bytes'] / 2**20:8.2f} MiB")
+    return results
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, cwd=Path(__file__).parent, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def load_history(path=HISTORY) -> List[dict]:
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return []
+
+def append_history(results: Dict[str, Dict[str, float]], path=HISTORY) -> dict:
+    """Agrega una ejecución al historial (escritura atómica) y la devuelve"""
+    entry = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    history = load_history(path)
+    history.append(entry)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(history, fh, indent=1)
+    os.replace(tmp, path)
+    return entry
+
+def compare(baseline: dict, candidate: dict, threshold: float = 0.1,
+            metrics: Sequence[str] = ('p50', 'peak_bytes')) -> List[Tuple[str, str, float]]:
+    """Regresiones (caso, métrica, cambio relativo) mayores que `threshold`
+
+    Solo se comparan los casos presentes en ambas ejecuciones.
+    """
+    regressions = []
+    for key, new in candidate['results'].items():
+        old = baseline['results'].get(key)
+        if old is None:
+            continue
+        for metric in metrics:
+            if old[metric] > 0:
+                change = new[metric] / old[metric] - 1
+                if change > threshold:
+                    regressions.append((key, metric, change))
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', default=HISTORY, help="archivo JSON del historial")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="ejecutar y guardar en el historial")
+    run_parser.add_argument('--filter', default='', help="subcadena del nombre del caso")
+    run_parser.add_argument('--max-size', type=int, default=DEFAULT_MAX_SIZE)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--no-save', action='store_true')
+    compare_parser = commands.add_parser('compare', help="comparar dos ejecuciones")
+    compare_parser.add_argument('--baseline', type=int, default=-2,
+                                help="índice de la ejecución base (por defecto la penúltima)")
+    compare_parser.add_argument('--candidate', type=int, default=-1,
+                                help="índice de la ejecución a evaluar (por defecto la última)")
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help="aumento relativo tolerado (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run_benchmarks(args.filter, args.max_size, args.seed)
+        if not args.no_save:
+            append_history(results, args.history)
+        return 0
+
+    history = load_history(args.history)
+    try:
+        baseline, candidate = history[args.baseline], history[args.candidate]
+    except IndexError:
+        parser.error(f"el historial {args.history} no tiene esas ejecuciones")
+    regressions = compare(baseline, candidate, args.threshold)
+    print(f"Base {baseline['timestamp']} ({baseline['commit']}) -> "
+          f"{candidate['timestamp']} ({candidate['commit']})")
+    for key, metric, change in regressions:
+        print(f"REGRESIÓN {key:<40} {metric:<10} {change:+.1%}")
+    if not regressions:
+        print(f"Sin regresiones por encima de {args.threshold:.0%}.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Caché persistente de simplificaciones y funciones lambdify de SymPy
+
+sp.simplify es el paso más caro de la demostración simbólica y su resultado
+no cambia entre ejecuciones. Cada entrada se guarda en disco como JSON,
+con una clave sha256 de la expresión de entrada (srepr), la operación y la
+versión de SymPy. Cuando el directorio supera max_bytes se borran las
+entradas usadas hace más tiempo (la lectura actualiza la fecha del archivo).
+
+En ejecuciones "calientes" simplify() solo reconstruye la expresión y
+lambdify() ejecuta el código fuente ya generado, sin volver a imprimirlo,
+en el mismo espacio de nombres que armó sp.lambdify (módulos pedidos más
+las importaciones del impresor, p. ej. math.erf).
+
+Frontera de confianza: las entradas contienen código (srepr que evalúa
+sympify y fuente que se ejecuta con exec), así que el directorio del caché
+equivale a código del usuario. Se crea con permisos 0700 y solo se leen
+archivos del mismo usuario que nadie más puede escribir; cada entrada
+guarda su clave y el sha256 de su contenido, y se descarta si no coinciden.
+Esto detecta archivos corruptos, renombrados o de otro usuario, pero no
+protege contra quien ya puede escribir como el propio usuario.
+"""
+import builtins
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import sympy as sp
+
+DEFAULT_MAX_BYTES = 16 * 2**20
+
+def default_directory() -> Path:
+    """Directorio del caché: $CAMPO_CACHE_DIR o ~/.cache/campo_electrico"""
+    env = os.environ.get('CAMPO_CACHE_DIR')
+    if env:
+        return Path(env)
+    return Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'campo_electrico'
+
+class SymbolicCache:
+    """Caché en disco, direccionado por contenido, para simplify y lambdify"""
+
+    def __init__(self, directory=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory is not None else default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, operation: str, *parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in (operation, sp.__version__) + parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _load(self, key: str):
+        path = self.directory / f"{key}.json"
+        try:
+            if not (_is_private(self.directory) and _is_private(path)):
+                raise ValueError(path)
+            with open(path, encoding='utf-8') as fh:
+                entry = json.load(fh)
+            value = entry['value']
+            if entry['key'] != key or entry['sha256'] != _digest(value):
+                raise ValueError(path)
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def _store(self, key: str, value):
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump({'sympy': sp.__version__, 'key': key,
+                           'sha256': _digest(value), 'value': value}, fh)
+            os.replace(tmp, self.directory / f"{key}.json")
+        except OSError:
+            return  # sin caché en disco se sigue funcionando, solo más lento
+        self._evict()
+
+    def _evict(self):
+        """Borra las entradas menos usadas hasta quedar por debajo de max_bytes"""
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Elimina todas las entradas del caché"""
+        for path in self.directory.glob('*.json'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def simplify(self, expr, **kwargs):
+        """sp.simplify(expr) con resultado guardado en disco"""
+        key = self._key('simplify', sp.srepr(expr), repr(sorted(kwargs.items())))
+        cached = self._load(key)
+        if cached is not None:
+            return sp.sympify(cached)
+        result = sp.simplify(expr, **kwargs)
+        self._store(key, sp.srepr(result))
+        return result
+
+    def lambdify(self, args: Sequence, expr, modules: str = 'numpy') -> Callable:
+        """sp.lambdify(args, expr, modules) con el código generado guardado en disco
+
+        modules es el nombre de un módulo que entiende sp.lambdify ('numpy',
+        'math', 'scipy', ...); forma parte de la clave del caché.
+        """
+        key = self._key('lambdify', modules, sp.srepr(tuple(args)), sp.srepr(expr))
+        cached = self._load(key)
+        if cached is not None:
+            func = _compile(cached, modules)
+            if func is not None:
+                return func
+        func = sp.lambdify(args, expr, modules)
+        base = _base_namespace(modules)
+        imports = [_importable(name, obj) for name, obj in func.__globals__.items()
+                   if name not in base]
+        self._store(key, {'source': inspect.getsource(func),
+                          'imports': sorted(filter(None, imports))})
+        return func
+
+def _is_private(path: Path) -> bool:
+    """True si path es del usuario actual y nadie más puede escribirlo"""
+    if os.name != 'posix':
+        return True
+    st = path.stat()
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+def _digest(value) -> str:
+    text = json.dumps(value, sort_keys=True, ensure_ascii=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+_base_namespaces = {}
+
+def _base_namespace(modules: str) -> dict:
+    """Espacio de nombres que sp.lambdify arma para modules, sin impresor"""
+    if modules not in _base_namespaces:
+        _base_namespaces[modules] = dict(sp.lambdify((), 0, modules).__globals__)
+    return _base_namespaces[modules]
+
+def _importable(name: str, obj) -> Optional[list]:
+    """[módulo, atributo] si obj se obtiene de nuevo importando módulo.atributo
+
+    Así se registran las importaciones que el impresor de sp.lambdify agregó
+    al espacio de nombres (p. ej. erf y gamma de math con modules='numpy').
+    """
+    module = getattr(obj, '__module__', None) or getattr(obj, '__name__', None)
+    for candidate in (module, 'numpy', 'math'):
+        if not isinstance(candidate, str):
+            continue
+        try:
+            found = getattr(importlib.import_module(candidate), name)
+        except (ImportError, AttributeError):
+            continue
+        if found is obj:
+            return [candidate, name]
+    return None
+
+def _compile(cached: dict, modules: str) -> Optional[Callable]:
+    """Reconstruye una función lambdify a partir de su código fuente
+
+    Devuelve None (y se vuelve a generar con sp.lambdify) si la entrada está
+    incompleta o el código usa nombres que el espacio de nombres no tiene.
+    """
+    namespace = dict(_base_namespace(modules))
+    try:
+        for module, name in cached['imports']:
+            namespace[name] = getattr(importlib.import_module(module), name)
+        code = compile(cached['source'], '<cache_simbolico>', 'exec')
+        exec(code, namespace)
+        func = namespace['_lambdifygenerated']
+    except (ImportError, AttributeError, KeyError, TypeError, ValueError,
+            SyntaxError, NameError):
+        return None
+    unresolved = [name for name in func.__code__.co_names
+                  if name not in namespace and not hasattr(builtins, name)]
+    return None if unresolved else func
+
+_default_cache: Optional[SymbolicCache] = None
+
+def default_cache() -> SymbolicCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SymbolicCache()
+    return _default_cache
+
+def cached_simplify(expr, **kwargs):
+    """Atajo para default_cache().simplify"""
+    return default_cache().simplify(expr, **kwargs)
+
+def cached_lambdify(args: Sequence, expr, modules: str = 'numpy') -> Callable:
+    """Atajo para default_cache().lambdify"""
+    return default_cache().lambdify(args, expr, modules)
@@ -0,0 +1,108 @@
+"""Campo eléctrico y potencial de N cargas puntuales evaluados en M puntos
+
+Núcleo de Coulomb en unidades gaussianas, el mismo de demostraciones.py:
+    E(p) = Σ q_j (p - r_j) / |p - r_j|^3        V(p) = Σ q_j / |p - r_j|
+Funciona en 2D y 3D (la dimensión la da la última columna de los arreglos).
+La matriz M×N nunca se materializa completa: se recorre en bloques cuyo
+tamaño se deriva de un presupuesto de memoria configurable.
+"""
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from metricas import instrumented
+
+# Presupuesto por defecto para los temporales de un bloque (bytes)
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+# Arreglos temporales (M_bloque × N_bloque) vivos a la vez en el núcleo
+_TEMPORARIES = 4
+
+def _as_charges(charge_positions, charges, dtype) -> Tuple[np.ndarray, np.ndarray]:
+    positions = np.atleast_2d(np.asarray(charge_positions, dtype=dtype))
+    charges = np.broadcast_to(np.asarray(charges, dtype=dtype), (len(positions),))
+    if positions.shape[1] not in (2, 3):
+        raise ValueError("Las posiciones deben tener 2 o 3 columnas.")
+    return positions, charges
+
+def block_shape(n_points: int, n_charges: int, dim: int, dtype=np.float64,
+                memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Tuple[int, int]:
+    """Tamaño (puntos, cargas) de bloque que respeta el presupuesto de memoria"""
+    itemsize = np.dtype(dtype).itemsize
+    pairs = max(1, memory_budget // ((_TEMPORARIES + dim) * itemsize))
+    charges_block = int(min(max(n_charges, 1), pairs))
+    points_block = int(min(max(n_points, 1), max(1, pairs // charges_block)))
+    return points_block, charges_block
+
+def _blocks(points: np.ndarray, positions: np.ndarray, memory_budget: int
+            ) -> Iterator[Tuple[slice, slice]]:
+    mb, nb = block_shape(len(points), len(positions), points.shape[1],
+                         points.dtype, memory_budget)
+    for i in range(0, len(points), mb):
+        for j in range(0, len(positions), nb):
+            yield slice(i, i + mb), slice(j, j + nb)
+
+def _kernel(points: np.ndarray, positions: np.ndarray, charges: np.ndarray,
+            min_distance: float, want_field: bool, want_potential: bool):
+    """Aporta E y/o V de un bloque de cargas sobre un bloque de puntos"""
+    diffs = [np.subtract.outer(points[:, k], positions[:, k]) for k in range(points.shape[1])]
+    r2 = diffs[0] * diffs[0]
+    for d in diffs[1:]:
+        r2 += d * d
+    # Las cargas a distancia <= min_distance no aportan (como en demostraciones.py)
+    near = r2 <= min_distance * min_distance
+    has_near = near.any()
+    if has_near:
+        r2[near] = 1.0
+    inv_r = np.sqrt(r2, out=r2)
+    np.reciprocal(inv_r, out=inv_r)
+    if has_near:
+        inv_r[near] = 0.0
+    field = None
+    potential = None
+    if want_potential:
+        potential = inv_r @ charges
+    if want_field:
+        q_inv_r3 = inv_r * inv_r
+        q_inv_r3 *= inv_r
+        q_inv_r3 *= charges
+        field = np.stack([np.einsum('ij,ij->i', q_inv_r3, d) for d in diffs], axis=1)
+    return field, potential
+
+@instrumented('campo.field_and_potential')
+def field_and_potential(points, charge_positions, charges=1.0, *,
+                        dtype=np.float64, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                        min_distance: float = 0.0, want_field: bool = True,
+                        want_potential: bool = True
+                        ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Campo (M, d) y potencial (M,) de N cargas en M puntos
+
+    points: arreglo (M, d) de puntos de evaluación, d = 2 o 3
+    charge_positions: arreglo (N, d); charges: escalar o arreglo (N,)
+    dtype: np.float32 o np.float64, precisión de todo el cálculo
+    memory_budget: bytes máximos para los temporales de cada bloque
+    min_distance: las cargas a esta distancia o menos de un punto se ignoran
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=dtype))
+    positions, charges = _as_charges(charge_positions, charges, dtype)
+    if points.shape[1] != positions.shape[1]:
+        raise ValueError("Puntos y cargas deben tener la misma dimensión.")
+    field = np.zeros(points.shape, dtype=dtype) if want_field else None
+    potential = np.zeros(len(points), dtype=dtype) if want_potential else None
+    for pts, chg in _blocks(points, positions, memory_budget):
+        e, v = _kernel(points[pts], positions[chg], charges[chg], min_distance,
+                       want_field, want_potential)
+        if want_field:
+            field[pts] += e
+        if want_potential:
+            potential[pts] += v
+    return field, potential
+
+def electric_field(points, charge_positions, charges=1.0, **kwargs) -> np.ndarray:
+    """Campo eléctrico (M, d); mismos parámetros que field_and_potential"""
+    return field_and_potential(points, charge_positions, charges,
+                               want_potential=False, **kwargs)[0]
+
+def electric_potential(points, charge_positions, charges=1.0, **kwargs) -> np.ndarray:
+    """Potencial eléctrico (M,); mismos parámetros que field_and_potential"""
+    return field_and_potential(points, charge_positions, charges,
+                               want_field=False, **kwargs)[1]
@@ -2,7 +2,31 @@ import math
 import matplotlib.pyplot as plt
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from metricas import instrumented
+
+# Filas del almacenamiento columnar de CentroidCalculator
+# (_IX, _IY, _IXY son los momentos de inercia centroidales de cada elemento)
+_AREA, _CX, _CY, _SIGN, _IX, _IY, _IXY = range(7)
+_N_ROWS = 7
+_INITIAL_CAPACITY = 16
+
+# Ángulo (radianes) hacia el que apunta la parte curva de un semicírculo
+SEMICIRCLE_ANGLES = {'right': 0.0, 'up': math.pi / 2, 'left': math.pi, 'down': -math.pi / 2}
+
+@dataclass(eq=False)
+class Shape:
+    """Geometría real de un elemento, para verificarlo o transformarlo
+    
+    kind y params:
+    - 'rectangle': (centro_x, centro_y, ancho, alto)
+    - 'circle': (centro_x, centro_y, radio)
+    - 'semicircle': (centro_x, centro_y, radio, ángulo de la parte curva)
+    - 'polygon': arreglo (N, 2) de vértices
+    """
+    kind: str
+    params: np.ndarray
 
 @dataclass
 class GeometricElement:
@@ -12,35 +36,403 @@ class GeometricElement:
     centroid_x: float
     centroid_y: float
     is_positive: bool = True  # True suma área, False resta área
+    # Momentos de inercia respecto a ejes centroidales paralelos a X e Y
+    ix: float = 0.0
+    iy: float = 0.0
+    ixy: float = 0.0
+    shape: Optional[Shape] = None  # None si solo se conocen área y centroide
     
     @property
     def signed_area(self):
         return self.area if self.is_positive else -self.area
+    
+    def _row(self) -> Tuple[float, ...]:
+        """Columna del almacenamiento de CentroidCalculator para este elemento"""
+        return (self.area, self.centroid_x, self.centroid_y,
+                1.0 if self.is_positive else -1.0, self.ix, self.iy, self.ixy)
+
+@dataclass
+class SectionProperties:
+    """Propiedades de área de una figura compuesta
+    
+    ix, iy, ixy son respecto a ejes centroidales paralelos a X e Y;
+    i1, i2 son los momentos principales (i1 >= i2) y theta_p el ángulo en
+    radianes, medido desde X, del eje principal de i1.
+    """
+    area: float
+    centroid_x: float
+    centroid_y: float
+    ix: float
+    iy: float
+    ixy: float
+    i1: float
+    i2: float
+    theta_p: float
+
+def section_properties_from_moments(ref_x: float, ref_y: float, area: float,
+                                    sx: float, sy: float, sxx: float, syy: float,
+                                    sxy: float) -> SectionProperties:
+    """Propiedades de sección a partir de momentos respecto al punto (ref_x, ref_y)
+    
+    sx = ∫x dA, sy = ∫y dA, sxx = ∫x² dA, syy = ∫y² dA, sxy = ∫xy dA, con
+    x e y medidos desde el punto de referencia (ejes paralelos).
+    """
+    offset_x = sx / area
+    offset_y = sy / area
+    ix_c = syy - area * offset_y**2
+    iy_c = sxx - area * offset_x**2
+    ixy_c = sxy - area * offset_x * offset_y
+    
+    # Ejes principales (círculo de Mohr)
+    mean = (ix_c + iy_c) / 2
+    radius = math.hypot((ix_c - iy_c) / 2, ixy_c)
+    theta_p = 0.5 * math.atan2(-2 * ixy_c, ix_c - iy_c)
+    return SectionProperties(float(area), float(ref_x + offset_x), float(ref_y + offset_y),
+                             float(ix_c), float(iy_c), float(ixy_c),
+                             float(mean + radius), float(mean - radius), theta_p)
+
+def _segment_sum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Suma `values` por segmentos offsets[k]:offsets[k+1] del último eje"""
+    starts = offsets[:-1]
+    non_empty = offsets[1:] > starts
+    out = np.zeros(values.shape[:-1] + (starts.size,))
+    if np.any(non_empty):
+        out[..., non_empty] = np.add.reduceat(values, starts[non_empty], axis=-1)
+    return out
+
+def polygons_moments(coords, offsets) -> Tuple[np.ndarray, ...]:
+    """Área con signo, centroide y momentos centroidales de muchos polígonos
+    
+    coords: arreglo (M, 2) con los vértices de todos los polígonos seguidos
+    offsets: arreglo (P+1,); el polígono k usa coords[offsets[k]:offsets[k+1]]
+    Devuelve (areas_con_signo, cx, cy, ix, iy, ixy). El área es positiva
+    para vértices en sentido antihorario y negativa en horario; los momentos
+    de inercia son siempre los de la región (no dependen del sentido).
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.intp).ravel()
+    counts = np.diff(offsets)
+    if offsets[0] != 0 or offsets[-1] != len(coords) or np.any(counts < 3):
+        raise ValueError("Cada polígono necesita al menos 3 vértices dentro de coords.")
+    
+    # Trasladar cada polígono a su primer vértice para reducir la cancelación
+    origin = coords[offsets[:-1]]
+    local = coords - np.repeat(origin, counts, axis=0)
+    nxt = np.arange(1, len(coords) + 1)
+    nxt[offsets[1:] - 1] = offsets[:-1]
+    x, y = local[:, 0], local[:, 1]
+    xn, yn = x[nxt], y[nxt]
+    cross = x * yn - xn * y
+    
+    twice_area, sum_x, sum_y, sum_yy, sum_xx, sum_xy = _segment_sum(np.stack((
+        cross,
+        (x + xn) * cross,
+        (y + yn) * cross,
+        (y * y + y * yn + yn * yn) * cross,
+        (x * x + x * xn + xn * xn) * cross,
+        (x * yn + 2 * x * y + 2 * xn * yn + xn * y) * cross,
+    )), offsets)
+    if np.any(twice_area == 0):
+        raise ValueError("Hay polígonos con área nula.")
+    area = twice_area / 2
+    local_cx = sum_x / (3 * twice_area)
+    local_cy = sum_y / (3 * twice_area)
+    # Teorema de ejes paralelos desde el primer vértice al centroide
+    orientation = np.sign(area)
+    ix = orientation * (sum_yy / 12 - area * local_cy**2)
+    iy = orientation * (sum_xx / 12 - area * local_cx**2)
+    ixy = orientation * (sum_xy / 24 - area * local_cx * local_cy)
+    return (area, origin[:, 0] + local_cx, origin[:, 1] + local_cy, ix, iy, ixy)
+
+def polygons_properties(coords, offsets) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Área con signo y centroide de muchos polígonos (fórmula del shoelace)
+    Mismas convenciones que polygons_moments().
+    """
+    return polygons_moments(coords, offsets)[:3]
+
+def polygon_properties(vertices) -> Tuple[float, float, float]:
+    """Área con signo y centroide de un polígono simple dado como arreglo (N, 2)"""
+    vertices = np.asarray(vertices, dtype=float).reshape(-1, 2)
+    area, cx, cy = polygons_properties(vertices, [0, len(vertices)])
+    return float(area[0]), float(cx[0]), float(cy[0])
+
+def _polygon_inertia(*vertices: float
+                     ) -> Tuple[float, float, float, float, float, float, Shape]:
+    """Área, centroide, momentos centroidales (ix, iy, ixy) y geometría de un
+    polígono x1, y1, x2, ...
+    
+    Mismas sumas del shoelace que polygons_moments(), en aritmética escalar:
+    para 3 o 4 vértices el costo de armar arreglos de NumPy domina.
+    """
+    x0, y0 = vertices[0], vertices[1]
+    xs = [x - x0 for x in vertices[0::2]]
+    ys = [y - y0 for y in vertices[1::2]]
+    twice_area = sum_x = sum_y = sum_xx = sum_yy = sum_xy = 0.0
+    for k in range(len(xs)):
+        x, y = xs[k - 1], ys[k - 1]
+        xn, yn = xs[k], ys[k]
+        cross = x * yn - xn * y
+        twice_area += cross
+        sum_x += (x + xn) * cross
+        sum_y += (y + yn) * cross
+        sum_xx += (x * x + x * xn + xn * xn) * cross
+        sum_yy += (y * y + y * yn + yn * yn) * cross
+        sum_xy += (x * yn + 2 * x * y + 2 * xn * yn + xn * y) * cross
+    if twice_area == 0:
+        raise ValueError("Hay polígonos con área nula.")
+    area = twice_area / 2
+    cx = sum_x / (3 * twice_area)
+    cy = sum_y / (3 * twice_area)
+    orientation = 1.0 if area > 0 else -1.0
+    ix = orientation * (sum_yy / 12 - area * cy * cy)
+    iy = orientation * (sum_xx / 12 - area * cx * cx)
+    ixy = orientation * (sum_xy / 24 - area * cx * cy)
+    coords = np.array(vertices, dtype=float).reshape(-1, 2)
+    return abs(area), x0 + cx, y0 + cy, ix, iy, ixy, Shape('polygon', coords)
+
+class _NeumaierSum:
+    """Suma compensada (Kahan-Neumaier) de varias magnitudes en paralelo"""
+    __slots__ = ('_sum', '_comp')
+    
+    def __init__(self, n: int):
+        self._sum = [0.0] * n
+        self._comp = [0.0] * n
+    
+    def add(self, values: Sequence[float]):
+        for k, v in enumerate(values):
+            s = self._sum[k]
+            t = s + v
+            if abs(s) >= abs(v):
+                self._comp[k] += (s - t) + v
+            else:
+                self._comp[k] += (v - t) + s
+            self._sum[k] = t
+    
+    def subtract(self, values: Sequence[float]):
+        self.add([-v for v in values])
+    
+    def value(self) -> Tuple[float, ...]:
+        return tuple(s + c for s, c in zip(self._sum, self._comp))
 
 class CentroidCalculator:
     """Calculadora de centroides para figuras compuestas
     
+    Los elementos se guardan en columnas NumPy (área, Cx, Cy, signo) que
+    crecen por duplicación de capacidad, de modo que el centroide y los
+    totales se obtienen con una sola reducción vectorizada. Además se
+    mantienen acumuladores compensados de ΣA, ΣA·Cx y ΣA·Cy, por lo que
+    calculate_centroid() es O(1) y quitar o reemplazar elementos también.
+    
     Métodos disponibles:
     - add_rectangle(): Rectángulo por dimensiones y centro
     - add_circle(): Círculo por radio y centro  
     - add_semicircle(): Semicírculo por radio, centro y orientación
     - add_triangle(): Triángulo rectángulo simple (LIMITADO)
     - add_triangle_by_vertices(): Triángulo por 3 vértices (GENERAL)
+    - add_polygon(): Polígono simple por arreglo de vértices (GENERAL)
+    - add_polygons(): Muchos polígonos en un solo buffer de coordenadas
     - add_custom_element(): Elemento con área y centroide conocidos
+    - add_many(): Carga masiva de elementos desde arreglos
+    - calculate_section_properties(): Centroide, inercias y ejes principales
+    - remove_element(): Quita un elemento por nombre
+    - clear(): Quita todos los elementos
+    - replace_element(): Reemplaza un elemento por nombre
     """
     
     def __init__(self):
-        self.elements: List[GeometricElement] = []
+        self._names: List[Optional[str]] = []
+        self._shapes: List[Optional[Shape]] = []
+        self._size = 0  # posiciones ocupadas, incluidas las eliminadas
+        self._live = 0  # elementos vigentes
+        self._data = np.empty((_N_ROWS, _INITIAL_CAPACITY))
+        self._index: Optional[Dict[str, List[int]]] = None
+        self._sums = _NeumaierSum(3)
+        self._version = 0  # cambia con cada modificación (cachés de figuras anidadas)
+    
+    def __len__(self) -> int:
+        return self._live
+    
+    @property
+    def elements(self) -> Tuple[GeometricElement, ...]:
+        """Copia de los elementos como objetos GeometricElement (tupla de solo lectura)
+        
+        Los cambios se hacen con add_element(), remove_element() o clear().
+        """
+        self._compact()
+        return tuple(self._element_at(i) for i in range(self._size))
+    
+    def _compact(self):
+        """Elimina los huecos dejados por remove_element() conservando el orden"""
+        if self._live == self._size:
+            return
+        keep = self._data[_SIGN, :self._size] != 0
+        self._data[:, :self._live] = self._data[:, :self._size][:, keep]
+        self._names = [name for name in self._names if name is not None]
+        self._shapes = [shape for shape, k in zip(self._shapes, keep.tolist()) if k]
+        self._size = self._live
+        self._index = None
+    
+    def _name_index(self) -> Dict[str, List[int]]:
+        """Índice nombre -> posiciones, construido solo cuando se necesita"""
+        if self._index is None:
+            index: Dict[str, List[int]] = {}
+            for i, name in enumerate(self._names):
+                if name is not None:
+                    index.setdefault(name, []).append(i)
+            self._index = index
+        return self._index
+    
+    def _element_at(self, i: int) -> GeometricElement:
+        area, cx, cy, sign, ix, iy, ixy = self._data[:, i].tolist()
+        return GeometricElement(self._names[i], area, cx, cy, sign > 0, ix, iy, ixy,
+                                self._shapes[i])
+    
+    def _contribution(self, i: int) -> Tuple[float, float, float]:
+        area, cx, cy, sign = self._data[:_IX, i].tolist()
+        signed = area * sign
+        return signed, signed * cx, signed * cy
+    
+    def _reserve(self, extra: int):
+        """Garantiza capacidad para `extra` elementos más (duplicando)"""
+        needed = self._size + extra
+        capacity = self._data.shape[1]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        data = np.empty((_N_ROWS, capacity))
+        data[:, :self._size] = self._data[:, :self._size]
+        self._data = data
+    
+    def _signed_area(self) -> np.ndarray:
+        return self._data[_AREA, :self._size] * self._data[_SIGN, :self._size]
     
+    def _totals(self) -> Tuple[float, float, float]:
+        """Devuelve (ΣA, ΣA·Cx, ΣA·Cy) desde los acumuladores compensados"""
+        total_area, sum_area_x, sum_area_y = self._sums.value()
+        return total_area, sum_area_x, sum_area_y
+    
+    @instrumented('centroide.add_element')
     def add_element(self, element: GeometricElement):
         """Agrega un elemento geométrico"""
-        self.elements.append(element)
+        self._reserve(1)
+        i = self._size
+        self._data[:, i] = element._row()
+        self._names.append(element.name)
+        self._shapes.append(element.shape)
+        if self._index is not None:
+            self._index.setdefault(element.name, []).append(i)
+        self._size += 1
+        self._live += 1
+        self._sums.add(self._contribution(i))
+        self._version += 1
+    
+    def remove_element(self, name: str) -> GeometricElement:
+        """Quita el último elemento agregado con ese nombre y lo devuelve"""
+        positions = self._name_index().get(name)
+        if not positions:
+            raise KeyError(f"No existe un elemento llamado '{name}'.")
+        i = positions.pop()
+        if not positions:
+            del self._index[name]
+        self._sums.subtract(self._contribution(i))
+        element = self._element_at(i)
+        self._data[_SIGN, i] = 0.0
+        self._names[i] = None
+        self._shapes[i] = None
+        self._live -= 1
+        self._version += 1
+        # Compactar cuando los huecos superan a los elementos vigentes
+        if self._size - self._live > max(self._live, _INITIAL_CAPACITY):
+            self._compact()
+        return element
+    
+    def clear(self):
+        """Quita todos los elementos"""
+        self._names = []
+        self._shapes = []
+        self._size = 0
+        self._live = 0
+        self._data = np.empty((_N_ROWS, _INITIAL_CAPACITY))
+        self._index = None
+        self._sums = _NeumaierSum(3)
+        self._version += 1
+    
+    def replace_element(self, name: str, element: GeometricElement):
+        """Reemplaza en su misma posición el último elemento con ese nombre"""
+        positions = self._name_index().get(name)
+        if not positions:
+            raise KeyError(f"No existe un elemento llamado '{name}'.")
+        i = positions[-1]
+        self._sums.subtract(self._contribution(i))
+        self._data[:, i] = element._row()
+        self._shapes[i] = element.shape
+        self._sums.add(self._contribution(i))
+        self._version += 1
+        if element.name != name:
+            positions.pop()
+            if not positions:
+                del self._index[name]
+            self._index.setdefault(element.name, []).append(i)
+            self._names[i] = element.name
+    
+    @instrumented('centroide.add_many')
+    def add_many(self, names: Optional[Sequence[str]], areas, centroids_x,
+                 centroids_y, is_positive=True, ix=0.0, iy=0.0, ixy=0.0,
+                 shapes: Optional[Sequence[Optional[Shape]]] = None):
+        """Agrega muchos elementos a la vez a partir de arreglos
+        
+        areas, centroids_x, centroids_y: arreglos 1D de igual longitud
+        is_positive: bool o arreglo de bool (se difunde a todos los elementos)
+        ix, iy, ixy: momentos de inercia centroidales (escalares o arreglos)
+        names: nombres de los elementos; si es None se generan automáticamente
+        shapes: geometría de cada elemento, si se conoce
+        """
+        areas = np.asarray(areas, dtype=float).ravel()
+        n = areas.size
+        centroids_x = np.broadcast_to(np.asarray(centroids_x, dtype=float), (n,))
+        centroids_y = np.broadcast_to(np.asarray(centroids_y, dtype=float), (n,))
+        is_positive = np.broadcast_to(np.asarray(is_positive, dtype=bool), (n,))
+        if names is None:
+            names = [f"E{i}" for i in range(self._size, self._size + n)]
+        elif len(names) != n:
+            raise ValueError("La cantidad de nombres no coincide con la de áreas.")
+        if shapes is None:
+            shapes = [None] * n
+        elif len(shapes) != n:
+            raise ValueError("La cantidad de geometrías no coincide con la de áreas.")
+        
+        self._reserve(n)
+        start, stop = self._size, self._size + n
+        self._data[_AREA, start:stop] = areas
+        self._data[_CX, start:stop] = centroids_x
+        self._data[_CY, start:stop] = centroids_y
+        self._data[_SIGN, start:stop] = np.where(is_positive, 1.0, -1.0)
+        self._data[_IX, start:stop] = ix
+        self._data[_IY, start:stop] = iy
+        self._data[_IXY, start:stop] = ixy
+        self._names.extend(names)
+        self._shapes.extend(shapes)
+        if self._index is not None:
+            for i, name in enumerate(names, start):
+                self._index.setdefault(name, []).append(i)
+        self._size = stop
+        self._live += n
+        self._version += 1
+        
+        signed = areas * self._data[_SIGN, start:stop]
+        self._sums.add((float(signed.sum()), float(signed @ centroids_x),
+                        float(signed @ centroids_y)))
     
     def add_rectangle(self, name: str, width: float, height: float, 
                      center_x: float, center_y: float, is_positive: bool = True):
         """Agrega un rectángulo"""
         area = width * height
-        element = GeometricElement(name, area, center_x, center_y, is_positive)
+        ix = width * height**3 / 12
+        iy = height * width**3 / 12
+        shape = Shape('rectangle', np.array([center_x, center_y, width, height], dtype=float))
+        element = GeometricElement(name, area, center_x, center_y, is_positive, ix, iy,
+                                   shape=shape)
         self.add_element(element)
 
     def add_rectangle_by_vertices(self, name: str, x1: float, y1: float, 
@@ -48,22 +440,24 @@ class CentroidCalculator:
                                  x4: float, y4: float, is_positive: bool = True):
         """Agrega un rectángulo usando las coordenadas de sus 4 vértices (método general)
         Los vértices deben estar en orden (horario o antihorario)
+        Para cuadriláteros que no son paralelogramos usar add_polygon()
         """
-        # Calcular área usando la fórmula del polígono (shoelace formula)
-        area = abs((x1*(y2-y4) + x2*(y3-y1) + x3*(y4-y2) + x4*(y1-y3)) / 2)
-        
-        # Centroide: promedio de los 4 vértices
-        centroid_x = (x1 + x2 + x3 + x4) / 4
-        centroid_y = (y1 + y2 + y3 + y4) / 4
-        
-        element = GeometricElement(name, area, centroid_x, centroid_y, is_positive)
+        # Área, centroide e inercias del mismo shoelace: el promedio de los
+        # vértices sólo coincide con el centroide en paralelogramos
+        area, centroid_x, centroid_y, ix, iy, ixy, shape = _polygon_inertia(
+            x1, y1, x2, y2, x3, y3, x4, y4)
+        element = GeometricElement(name, area, centroid_x, centroid_y, is_positive,
+                                   ix, iy, ixy, shape)
         self.add_element(element)
     
     def add_circle(self, name: str, radius: float, center_x: float, 
                   center_y: float, is_positive: bool = True):
         """Agrega un círculo"""
         area = math.pi * radius**2
-        element = GeometricElement(name, area, center_x, center_y, is_positive)
+        inertia = math.pi * radius**4 / 4
+        shape = Shape('circle', np.array([center_x, center_y, radius], dtype=float))
+        element = GeometricElement(name, area, center_x, center_y, is_positive,
+                                   inertia, inertia, shape=shape)
         self.add_element(element)
     
     def add_semicircle(self, name: str, radius: float, center_x: float, 
@@ -86,38 +480,79 @@ class CentroidCalculator:
         elif orientation == 'left':
             centroid_x = center_x - (4 * radius) / (3 * math.pi)
             centroid_y = center_y
+        
+        # Inercias centroidales: paralela y perpendicular al diámetro
+        i_parallel = (math.pi / 8 - 8 / (9 * math.pi)) * radius**4
+        i_normal = math.pi * radius**4 / 8
+        if orientation in ('up', 'down'):
+            ix, iy = i_parallel, i_normal
+        else:
+            ix, iy = i_normal, i_parallel
             
-        element = GeometricElement(name, area, centroid_x, centroid_y, is_positive)
+        shape = Shape('semicircle', np.array([center_x, center_y, radius,
+                                              SEMICIRCLE_ANGLES[orientation]]))
+        element = GeometricElement(name, area, centroid_x, centroid_y, is_positive, ix, iy,
+                                   shape=shape)
         self.add_element(element)
     
     def add_triangle_by_vertices(self, name: str, x1: float, y1: float, 
                                 x2: float, y2: float, x3: float, y3: float, 
                                 is_positive: bool = True):
         """Agrega un triángulo usando sus 3 vértices (método general)"""
-        # Área usando fórmula del determinante
-        area = abs((x1*(y2-y3) + x2*(y3-y1) + x3*(y1-y2)) / 2)
-        
-        # Centroide: promedio de los vértices
-        centroid_x = (x1 + x2 + x3) / 3
-        centroid_y = (y1 + y2 + y3) / 3
-        
-        element = GeometricElement(name, area, centroid_x, centroid_y, is_positive)
+        area, centroid_x, centroid_y, ix, iy, ixy, shape = _polygon_inertia(
+            x1, y1, x2, y2, x3, y3)
+        element = GeometricElement(name, area, centroid_x, centroid_y, is_positive,
+                                   ix, iy, ixy, shape)
+        self.add_element(element)
+    
+    def add_polygon(self, name: str, vertices, is_positive: Optional[bool] = True):
+        """Agrega un polígono simple a partir de un arreglo (N, 2) de vértices
+        Área y centroide exactos por la fórmula del shoelace.
+        is_positive=None toma el signo del sentido de giro (antihorario suma)
+        """
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 2)
+        area, centroid_x, centroid_y, ix, iy, ixy = (
+            float(v[0]) for v in polygons_moments(vertices, [0, len(vertices)]))
+        if is_positive is None:
+            is_positive = area > 0
+        element = GeometricElement(name, abs(area), centroid_x, centroid_y, is_positive,
+                                   ix, iy, ixy, Shape('polygon', vertices))
         self.add_element(element)
     
+    @instrumented('centroide.add_polygons')
+    def add_polygons(self, names: Optional[Sequence[str]], coords, offsets,
+                     is_positive=True):
+        """Agrega muchos polígonos empaquetados en un solo buffer (M, 2)
+        El polígono k usa coords[offsets[k]:offsets[k+1]].
+        is_positive: bool, arreglo de bool o None (signo según sentido de giro)
+        """
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        offsets = np.asarray(offsets, dtype=np.intp).ravel()
+        area, centroid_x, centroid_y, ix, iy, ixy = polygons_moments(coords, offsets)
+        if is_positive is None:
+            is_positive = area > 0
+        bounds = offsets.tolist()
+        shapes = [Shape('polygon', coords[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+        self.add_many(names, np.abs(area), centroid_x, centroid_y, is_positive,
+                      ix, iy, ixy, shapes)
+    
     def add_custom_element(self, name: str, area: float, centroid_x: float, 
-                          centroid_y: float, is_positive: bool = True):
-        """Agrega un elemento con área y centroide personalizado"""
-        element = GeometricElement(name, area, centroid_x, centroid_y, is_positive)
+                          centroid_y: float, is_positive: bool = True,
+                          ix: float = 0.0, iy: float = 0.0, ixy: float = 0.0):
+        """Agrega un elemento con área y centroide personalizado
+        ix, iy, ixy: momentos de inercia centroidales, si se conocen
+        """
+        element = GeometricElement(name, area, centroid_x, centroid_y, is_positive,
+                                   ix, iy, ixy)
         self.add_element(element)
     
+    @instrumented('centroide.calculate_centroid')
     def calculate_centroid(self) -> Tuple[float, float]:
         """Calcula el centroide de la figura compuesta"""
-        if not self.elements:
+        if not self._live:
             return 0.0, 0.0
         
-        sum_area_x = sum(elem.signed_area * elem.centroid_x for elem in self.elements)
-        sum_area_y = sum(elem.signed_area * elem.centroid_y for elem in self.elements)
-        total_area = sum(elem.signed_area for elem in self.elements)
+        total_area, sum_area_x, sum_area_y = self._totals()
         
         if total_area == 0:
             raise ValueError("El área total es cero. Revisa los elementos.")
@@ -127,14 +562,44 @@ class CentroidCalculator:
         
         return centroid_x, centroid_y
     
+    @instrumented('centroide.calculate_section_properties')
+    def calculate_section_properties(self) -> SectionProperties:
+        """Calcula área, centroide, inercias centroidales y ejes principales
+        
+        Todo sale de un solo recorrido vectorizado de las columnas: los
+        centroides se refieren a un punto de referencia cercano (el centroide
+        de los acumuladores) y se aplica el teorema de ejes paralelos.
+        """
+        if not self._live:
+            raise ValueError("No hay elementos definidos.")
+        ref_x, ref_y = self.calculate_centroid()
+        
+        n = self._size
+        area, cx, cy, sign, ix, iy, ixy = self._data[:, :n]
+        signed = area * sign
+        dx = cx - ref_x
+        dy = cy - ref_y
+        total_area, qy, qx, sum_ix, sum_iy, sum_ixy = np.stack((
+            signed,
+            signed * dx,
+            signed * dy,
+            signed * dy * dy + sign * ix,
+            signed * dx * dx + sign * iy,
+            signed * dx * dy + sign * ixy,
+        )).sum(axis=1)
+        
+        return section_properties_from_moments(ref_x, ref_y, total_area, qy, qx,
+                                               sum_iy, sum_ix, sum_ixy)
+    
+    @instrumented('centroide.get_summary_table')
     def get_summary_table(self) -> str:
         """Genera una tabla resumen de los cálculos"""
-        if not self.elements:
+        if not self._live:
             return "No hay elementos definidos."
         
-        # Calcular centroide
+        # Calcular centroide y totales
         centroid_x, centroid_y = self.calculate_centroid()
-        total_area = sum(elem.signed_area for elem in self.elements)
+        total_area, sum_area_x, sum_area_y = self._totals()
         
         # Crear tabla
         header = f"{'ELEMENTO':<15} {'ÁREA':<10} {'Cx':<8} {'Cy':<8} {'A*Cx':<12} {'A*Cy':<12}"
@@ -142,19 +607,50 @@ class CentroidCalculator:
         
         lines = [header, separator]
         
-        for elem in self.elements:
-            area_cx = elem.signed_area * elem.centroid_x
-            area_cy = elem.signed_area * elem.centroid_y
-            line = f"{elem.name:<15} {elem.signed_area:<10.2f} {elem.centroid_x:<8.2f} {elem.centroid_y:<8.2f} {area_cx:<12.2f} {area_cy:<12.2f}"
-            lines.append(line)
+        for names, *columns in self.iter_table():
+            for name, a, x, y, ax_, ay_ in zip(names, *(c.tolist() for c in columns)):
+                lines.append(f"{name:<15} {a:<10.2f} {x:<8.2f} {y:<8.2f} {ax_:<12.2f} {ay_:<12.2f}")
         
         lines.append(separator)
-        lines.append(f"{'TOTAL':<15} {total_area:<10.2f} {'':<8} {'':<8} {sum(e.signed_area * e.centroid_x for e in self.elements):<12.2f} {sum(e.signed_area * e.centroid_y for e in self.elements):<12.2f}")
+        lines.append(f"{'TOTAL':<15} {total_area:<10.2f} {'':<8} {'':<8} {sum_area_x:<12.2f} {sum_area_y:<12.2f}")
         lines.append("")
         lines.append(f"CENTROIDE: X = {centroid_x:.2f}, Y = {centroid_y:.2f}")
         
         return "\n".join(lines)
     
+    def iter_table(self, chunk_size: int = 65536):
+        """Genera la tabla resumen por bloques de columnas vectorizadas
+        
+        Cada bloque es (nombres, área con signo, Cx, Cy, A*Cx, A*Cy) con a lo
+        sumo chunk_size filas, en el orden en que se agregaron los elementos.
+        """
+        self._compact()
+        for start in range(0, self._size, chunk_size):
+            stop = min(start + chunk_size, self._size)
+            area, cx, cy, sign = self._data[:_IX, start:stop]
+            signed = area * sign
+            yield self._names[start:stop], signed, cx, cy, signed * cx, signed * cy
+    
+    def export_table(self, path, fmt: Optional[str] = None, chunk_size: int = 65536,
+                     precision: Optional[int] = None):
+        """Escribe la tabla resumen y los totales en CSV, JSON lines, Parquet o .npy
+        
+        Ver exportar_tabla.export_table.
+        """
+        from exportar_tabla import export_table
+        return export_table(self, path, fmt, chunk_size, precision)
+    
+    def save(self, path):
+        """Guarda la figura en formato binario .cfig (ver formato_figura)"""
+        from formato_figura import save_figure
+        return save_figure(self, path)
+    
+    def import_drawing(self, path, **kwargs):
+        """Agrega las regiones de un dibujo .svg o .dxf (ver importar_cad)"""
+        from importar_cad import import_drawing
+        return import_drawing(path, self, **kwargs)[1]
+    
+    @instrumented('centroide.plot_elements')
     def plot_elements(self, figsize=(12, 8)):
         """Visualiza los elementos y el centroide"""
         fig, ax = plt.subplots(figsize=figsize)
@@ -192,6 +688,86 @@ class CentroidCalculator:
         plt.tight_layout()
         plt.show()
 
+class BatchCentroidCalculator:
+    """Evalúa muchas figuras compuestas a la vez
+    
+    Las figuras se describen con una tabla plana de elementos (área, Cx, Cy,
+    signo) y un arreglo de offsets: los elementos de la figura k ocupan
+    las posiciones offsets[k]:offsets[k+1]. Los totales por figura se
+    obtienen con reducciones segmentadas (np.add.reduceat).
+    """
+    
+    def __init__(self, areas, centroids_x, centroids_y, offsets, is_positive=True):
+        self.areas = np.asarray(areas, dtype=float).ravel()
+        n = self.areas.size
+        self.centroids_x = np.broadcast_to(np.asarray(centroids_x, dtype=float), (n,))
+        self.centroids_y = np.broadcast_to(np.asarray(centroids_y, dtype=float), (n,))
+        self.signs = np.where(np.broadcast_to(np.asarray(is_positive, dtype=bool), (n,)),
+                              1.0, -1.0)
+        self.offsets = np.asarray(offsets, dtype=np.intp).ravel()
+        if (self.offsets.size == 0 or self.offsets[0] != 0 or self.offsets[-1] != n
+                or np.any(np.diff(self.offsets) < 0)):
+            raise ValueError("offsets debe ser creciente, iniciar en 0 y terminar en el número de elementos.")
+    
+    @classmethod
+    def from_figure_ids(cls, figure_ids, areas, centroids_x, centroids_y,
+                        is_positive=True, n_figures: Optional[int] = None):
+        """Construye el lote a partir de un identificador de figura por elemento"""
+        figure_ids = np.asarray(figure_ids, dtype=np.intp).ravel()
+        n = figure_ids.size
+        order = np.argsort(figure_ids, kind='stable')
+        if n_figures is None:
+            n_figures = int(figure_ids.max()) + 1 if n else 0
+        counts = np.bincount(figure_ids, minlength=n_figures)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        
+        def take(values):
+            return np.broadcast_to(np.asarray(values), (n,))[order]
+        
+        return cls(take(np.asarray(areas, dtype=float)), take(centroids_x),
+                   take(centroids_y), offsets, take(is_positive))
+    
+    @classmethod
+    def from_calculators(cls, calculators: Sequence['CentroidCalculator']):
+        """Concatena las tablas de varias CentroidCalculator en un solo lote"""
+        sizes = [len(calc) for calc in calculators]
+        offsets = np.concatenate(([0], np.cumsum(sizes, dtype=np.intp)))
+        if calculators:
+            for calc in calculators:
+                calc._compact()
+            data = np.concatenate([calc._data[:, :len(calc)] for calc in calculators], axis=1)
+        else:
+            data = np.empty((_N_ROWS, 0))
+        return cls(data[_AREA], data[_CX], data[_CY], offsets, data[_SIGN] > 0)
+    
+    def __len__(self) -> int:
+        return self.offsets.size - 1
+    
+    def calculate_totals(self) -> np.ndarray:
+        """Devuelve un arreglo (3, n_figuras) con ΣA, ΣA·Cx y ΣA·Cy"""
+        signed = self.areas * self.signs
+        return _segment_sum(np.stack((signed,
+                                      signed * self.centroids_x,
+                                      signed * self.centroids_y)), self.offsets)
+    
+    def calculate_centroids(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Calcula área total y centroide de cada figura
+        
+        Devuelve (areas, centroides_x, centroides_y). Las figuras vacías
+        tienen centroide (0, 0) y las de área total cero, NaN.
+        """
+        total_area, sum_area_x, sum_area_y = self.calculate_totals()
+        centroid_x = np.zeros_like(total_area)
+        centroid_y = np.zeros_like(total_area)
+        empty = self.offsets[1:] == self.offsets[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(sum_area_x, total_area, out=centroid_x, where=~empty)
+            np.divide(sum_area_y, total_area, out=centroid_y, where=~empty)
+        zero = ~empty & (total_area == 0)
+        centroid_x[zero] = np.nan
+        centroid_y[zero] = np.nan
+        return total_area, centroid_x, centroid_y
+
 def ejemplo_figura_con_calculo_automatico():
     """Mismo ejemplo pero usando CÁLCULO AUTOMÁTICO con el sistema correcto de coordenadas"""
     calc = CentroidCalculator()
@@ -0,0 +1,407 @@
+"""Distribuciones continuas de carga: líneas, anillos, discos, placas y volúmenes
+
+Mismo núcleo gaussiano que campo_cargas, integrado sobre la fuente:
+    E(p) = ∫ (p - r) / |p - r|^3 dq        V(p) = ∫ dq / |p - r|
+
+Cada distribución se parametriza sobre [0, 1]^k (k = 1, 2 o 3) y devuelve
+puntos fuente y pesos dq = densidad · jacobiano, igual que las superficies
+de flujo_gauss. La cuadratura es de Gauss-Legendre tensorial y adaptativa
+por par (punto, parche): cada parche se compara con la suma de sus 2^k
+hijos y solo se subdividen los pares que no concuerdan, lo que resuelve
+los puntos cercanos a la fuente (casi singulares) sin refinar los lejanos.
+Todo se evalúa para todos los puntos objetivo a la vez.
+
+Donde existe forma cerrada se usa directamente: segmentos y líneas
+infinitas en todo el espacio, esferas uniformes, y anillos y discos sobre
+su eje.
+"""
+from abc import ABC, abstractmethod
+from typing import Sequence, Tuple
+
+import numpy as np
+
+import campo_cargas
+from metricas import instrumented
+
+# Puntos con distancia perpendicular al eje menor que esto (relativa al radio)
+# se consideran sobre el eje de anillos y discos
+_AXIS_TOLERANCE = 1e-12
+# Tolerancia relativa mínima por parche: por debajo solo se refina ruido de redondeo
+_ROUNDOFF = 64 * np.finfo(float).eps
+
+def _frame(normal) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Base ortonormal (e1, e2, n) con n en la dirección de `normal`"""
+    n = np.asarray(normal, dtype=float)
+    n = n / np.linalg.norm(n)
+    helper = np.array([1.0, 0.0, 0.0]) if abs(n[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    e1 = np.cross(n, helper)
+    e1 /= np.linalg.norm(e1)
+    return e1, np.cross(n, e1), n
+
+def _points(points) -> np.ndarray:
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+    if points.shape[1] != 3:
+        raise ValueError("Las distribuciones continuas se evalúan en 3D.")
+    return points
+
+class Distribution(ABC):
+    """Carga distribuida sobre un dominio paramétrico [0, 1]^dim"""
+    dim = 1
+
+    @abstractmethod
+    def sample(self, u: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Puntos fuente (K, 3) y dq/du (K,) en los parámetros u (K, dim)"""
+
+    @abstractmethod
+    def total_charge(self) -> float:
+        """Carga total de la distribución"""
+
+    def closed_form(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(máscara, E, V) de los puntos que tienen forma cerrada; por defecto ninguno"""
+        return np.zeros(len(points), dtype=bool), np.zeros((0, 3)), np.zeros(0)
+
+    def field_and_potential(self, points, *, order: int = 8, tol: float = 1e-8,
+                            max_level: int = 30, initial_level: int = 1,
+                            memory_budget: int = campo_cargas.DEFAULT_MEMORY_BUDGET
+                            ) -> Tuple[np.ndarray, np.ndarray]:
+        """Campo (M, 3) y potencial (M,) en los puntos
+
+        order: nodos de Gauss-Legendre por dirección en cada parche
+        tol: tolerancia relativa por punto (a Σ|aportes| de los parches iniciales);
+            por debajo de ~1e-12 domina el redondeo de p - r y se refina de más
+        max_level: subdivisiones máximas de un parche (puntos sobre la fuente)
+        """
+        points = _points(points)
+        field = np.zeros((len(points), 3))
+        potential = np.zeros(len(points))
+        exact, e, v = self.closed_form(points)
+        field[exact] = e
+        potential[exact] = v
+        rest = np.flatnonzero(~exact)
+        if rest.size:
+            e, v = _adaptive(self, points[rest], order, tol, max_level, initial_level,
+                             memory_budget)
+            field[rest] = e
+            potential[rest] = v
+        return field, potential
+
+def _gauss_nodes(order: int, dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Nodos (K, dim) y pesos (K,) tensoriales en [0, 1]^dim"""
+    x, w = np.polynomial.legendre.leggauss(order)
+    x = (x + 1) / 2
+    w = w / 2
+    grids = np.meshgrid(*([x] * dim), indexing='ij')
+    weights = np.prod(np.meshgrid(*([w] * dim), indexing='ij'), axis=0)
+    return np.stack([g.ravel() for g in grids], axis=1), weights.ravel()
+
+def _panel_contributions(dist, targets, lo, h, nodes, weights, memory_budget):
+    """Aporte [Ex, Ey, Ez, V] de cada par (objetivo, parche [lo, lo + h]^dim)"""
+    k = len(weights)
+    out = np.empty((len(targets), 4))
+    # Temporales por nodo: fuente, diferencia, distancias y aportes
+    chunk = max(1, memory_budget // (k * 8 * 16))
+    for i in range(0, len(targets), chunk):
+        t, l, s = targets[i:i + chunk], lo[i:i + chunk], h[i:i + chunk]
+        u = l[:, None, :] + s[:, None, None] * nodes[None]
+        source, dq = dist.sample(u.reshape(-1, nodes.shape[1]))
+        dq = dq.reshape(-1, k) * weights * (s**nodes.shape[1])[:, None]
+        d = t[:, None, :] - source.reshape(-1, k, 3)
+        r2 = np.einsum('ijk,ijk->ij', d, d)
+        # La singularidad exacta (punto sobre un nodo) no aporta, como en campo_cargas
+        zero = r2 == 0
+        r2[zero] = 1.0
+        inv_r = 1.0 / np.sqrt(r2)
+        inv_r[zero] = 0.0
+        q_inv_r = dq * inv_r
+        out[i:i + chunk, :3] = np.einsum('ij,ijk->ik', q_inv_r * inv_r * inv_r, d)
+        out[i:i + chunk, 3] = q_inv_r.sum(axis=1)
+    return out
+
+def _adaptive(dist, points, order, tol, max_level, initial_level, memory_budget):
+    dim = dist.dim
+    nodes, weights = _gauss_nodes(order, dim)
+    n0 = 2**initial_level
+    corners = np.stack([g.ravel() for g in np.meshgrid(*([np.arange(n0) / n0] * dim),
+                                                       indexing='ij')], axis=1)
+    m = len(points)
+    target = np.repeat(np.arange(m), len(corners))
+    lo = np.tile(corners, (m, 1))
+    h = np.full(len(target), 1.0 / n0)
+    estimate = _panel_contributions(dist, points[target], lo, h, nodes, weights,
+                                    memory_budget)
+
+    # Escala de cada punto: suma de los módulos de los aportes iniciales
+    scale_e = np.bincount(target, np.linalg.norm(estimate[:, :3], axis=1), minlength=m)
+    scale_v = np.bincount(target, np.abs(estimate[:, 3]), minlength=m)
+    tiny = np.finfo(float).tiny
+    atol_e = tol * np.maximum(scale_e, tiny)
+    atol_v = tol * np.maximum(scale_v, tiny)
+    rtol = max(tol, _ROUNDOFF)
+
+    children = np.stack([g.ravel() for g in np.meshgrid(*([[0.0, 0.5]] * dim),
+                                                        indexing='ij')], axis=1)
+    n_children = len(children)
+    total = np.zeros((m, 4))
+    for _ in range(max_level - initial_level):
+        if not len(target):
+            break
+        tc = np.repeat(target, n_children)
+        hc = np.repeat(h / 2, n_children)
+        lc = np.repeat(lo, n_children, axis=0) + np.tile(children, (len(target), 1)) * \
+            np.repeat(h, n_children)[:, None]
+        child = _panel_contributions(dist, points[tc], lc, hc, nodes, weights, memory_budget)
+        refined = child.reshape(-1, n_children, 4).sum(axis=1)
+        diff = refined - estimate
+        # Un parche converge si su error es pequeño frente a la tolerancia global
+        # repartida según su medida paramétrica, o frente a Σ|aportes| de sus
+        # hijos (esto evita refinar sin fin junto a la singularidad integrable
+        # de superficies y volúmenes, y por debajo del redondeo)
+        measure = h**dim
+        size_e = np.linalg.norm(child[:, :3], axis=1).reshape(-1, n_children).sum(axis=1)
+        size_v = np.abs(child[:, 3]).reshape(-1, n_children).sum(axis=1)
+        err_e = np.linalg.norm(diff[:, :3], axis=1)
+        err_v = np.abs(diff[:, 3])
+        done = (((err_e <= atol_e[target] * measure) | (err_e <= rtol * size_e))
+                & ((err_v <= atol_v[target] * measure) | (err_v <= rtol * size_v)))
+        for c in range(4):
+            total[:, c] += np.bincount(target[done], refined[done, c], minlength=m)
+        keep = np.repeat(~done, n_children)
+        target, lo, h, estimate = tc[keep], lc[keep], hc[keep], child[keep]
+    for c in range(4):
+        total[:, c] += np.bincount(target, estimate[:, c], minlength=m)
+    return total[:, :3], total[:, 3]
+
+class Segment(Distribution):
+    """Segmento recto de a a b con densidad lineal uniforme λ (forma cerrada)"""
+
+    def __init__(self, a, b, density: float = 1.0):
+        self.a = np.asarray(a, dtype=float)
+        self.b = np.asarray(b, dtype=float)
+        self.density = float(density)
+
+    def sample(self, u):
+        t = u[:, 0]
+        axis = self.b - self.a
+        return self.a + t[:, None] * axis, np.full(len(t), self.density * np.linalg.norm(axis))
+
+    def total_charge(self) -> float:
+        return self.density * float(np.linalg.norm(self.b - self.a))
+
+    def closed_form(self, points):
+        axis = self.b - self.a
+        length = np.linalg.norm(axis)
+        e = axis / length
+        rel = points - self.a
+        along = rel @ e
+        perp = rel - along[:, None] * e
+        d = np.linalg.norm(perp, axis=1)
+        # Coordenadas de los extremos a lo largo del eje, relativas al pie de la perpendicular
+        s1 = -along
+        s2 = length - along
+        r1 = np.hypot(s1, d)
+        r2 = np.hypot(s2, d)
+        lam = self.density
+        safe_d = np.where(d > 0, d, 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # s2/r2 - s1/r1 cancela si ambos extremos quedan del mismo lado del pie
+            same_side = s1 * s2 > 0
+            direct = (s2 / r2 - s1 / r1) / safe_d
+            stable = d * (s2 * s2 - s1 * s1) / (r1 * r2 * (s2 * r1 + s1 * r2))
+            e_perp = lam * np.where(same_side, stable, direct)
+            e_par = lam * (1 / r2 - 1 / r1)
+            potential = lam * np.where(d > 0, np.arcsinh(s2 / safe_d) - np.arcsinh(s1 / safe_d),
+                                       np.log(np.abs(s2 / s1)) * np.sign(s2))
+        field = np.where((d > 0)[:, None], perp / safe_d[:, None], 0.0) * e_perp[:, None]
+        field += e_par[:, None] * e
+        # Puntos sobre el propio segmento (hasta el redondeo): singular, se dejan en cero
+        on_source = (d <= _AXIS_TOLERANCE * length) & ~same_side
+        field[on_source] = 0.0
+        potential[on_source] = 0.0
+        return np.ones(len(points), dtype=bool), field, potential
+
+class InfiniteLine(Distribution):
+    """Línea infinita con densidad λ; V = -2λ ln(d / reference_radius)"""
+
+    def __init__(self, point, direction, density: float = 1.0, reference_radius: float = 1.0):
+        self.point = np.asarray(point, dtype=float)
+        self.direction = np.asarray(direction, dtype=float) / np.linalg.norm(direction)
+        self.density = float(density)
+        self.reference_radius = reference_radius
+
+    def sample(self, u):
+        # t = tan(π (u - 1/2)) recorre toda la recta; no se usa (forma cerrada)
+        angle = np.pi * (u[:, 0] - 0.5)
+        t = np.tan(angle)
+        return (self.point + t[:, None] * self.direction,
+                self.density * np.pi / np.cos(angle)**2)
+
+    def total_charge(self) -> float:
+        return float('inf') if self.density else 0.0
+
+    def closed_form(self, points):
+        rel = points - self.point
+        perp = rel - (rel @ self.direction)[:, None] * self.direction
+        d2 = np.einsum('ij,ij->i', perp, perp)
+        on_line = d2 == 0
+        d2[on_line] = 1.0
+        field = (2 * self.density / d2)[:, None] * perp
+        potential = -self.density * np.log(d2 / self.reference_radius**2)
+        field[on_line] = 0.0
+        potential[on_line] = 0.0
+        return np.ones(len(points), dtype=bool), field, potential
+
+class Ring(Distribution):
+    """Anillo (o arco si angle_span < 2π) de radio R con densidad lineal λ"""
+
+    def __init__(self, center, normal, radius: float, density: float = 1.0,
+                 angle_span: float = 2 * np.pi):
+        self.center = np.asarray(center, dtype=float)
+        self.e1, self.e2, self.normal = _frame(normal)
+        self.radius = float(radius)
+        self.density = float(density)
+        self.angle_span = float(angle_span)
+
+    def sample(self, u):
+        phi = self.angle_span * u[:, 0]
+        points = self.center + self.radius * (np.cos(phi)[:, None] * self.e1
+                                              + np.sin(phi)[:, None] * self.e2)
+        return points, np.full(len(phi), self.density * self.radius * self.angle_span)
+
+    def total_charge(self) -> float:
+        return self.density * self.radius * self.angle_span
+
+    def closed_form(self, points):
+        if self.angle_span < 2 * np.pi:
+            return super().closed_form(points)
+        rel = points - self.center
+        z = rel @ self.normal
+        rho = np.linalg.norm(rel - z[:, None] * self.normal, axis=1)
+        on_axis = rho <= _AXIS_TOLERANCE * self.radius
+        z = z[on_axis]
+        q = self.total_charge()
+        r = np.hypot(z, self.radius)
+        return on_axis, (q * z / r**3)[:, None] * self.normal, q / r
+
+class Disk(Distribution):
+    """Disco (o corona si inner_radius > 0) con densidad superficial σ"""
+    dim = 2
+
+    def __init__(self, center, normal, radius: float, density: float = 1.0,
+                 inner_radius: float = 0.0):
+        self.center = np.asarray(center, dtype=float)
+        self.e1, self.e2, self.normal = _frame(normal)
+        self.radius = float(radius)
+        self.inner_radius = float(inner_radius)
+        self.density = float(density)
+
+    def sample(self, u):
+        width = self.radius - self.inner_radius
+        r = self.inner_radius + width * u[:, 0]
+        phi = 2 * np.pi * u[:, 1]
+        points = self.center + r[:, None] * (np.cos(phi)[:, None] * self.e1
+                                             + np.sin(phi)[:, None] * self.e2)
+        return points, self.density * r * width * 2 * np.pi
+
+    def total_charge(self) -> float:
+        return self.density * np.pi * (self.radius**2 - self.inner_radius**2)
+
+    def closed_form(self, points):
+        rel = points - self.center
+        z = rel @ self.normal
+        rho = np.linalg.norm(rel - z[:, None] * self.normal, axis=1)
+        on_axis = rho <= _AXIS_TOLERANCE * self.radius
+        z = z[on_axis]
+        outer = np.hypot(z, self.radius)
+        inner = np.hypot(z, self.inner_radius)
+        two_pi_sigma = 2 * np.pi * self.density
+        # Con inner_radius = 0 y z = 0 (centro del disco) E_z es discontinuo: se toma 0
+        e_z = two_pi_sigma * np.where(inner > 0, z / np.where(inner > 0, inner, 1.0), 0.0)
+        e_z -= two_pi_sigma * z / outer
+        return on_axis, e_z[:, None] * self.normal, two_pi_sigma * (outer - inner)
+
+class Plate(Distribution):
+    """Paralelogramo corner + u·edge1 + v·edge2 con densidad superficial σ"""
+    dim = 2
+
+    def __init__(self, corner, edge1, edge2, density: float = 1.0):
+        self.corner = np.asarray(corner, dtype=float)
+        self.edge1 = np.asarray(edge1, dtype=float)
+        self.edge2 = np.asarray(edge2, dtype=float)
+        self.density = float(density)
+
+    def _area(self) -> float:
+        return float(np.linalg.norm(np.cross(self.edge1, self.edge2)))
+
+    def sample(self, u):
+        points = self.corner + u[:, :1] * self.edge1 + u[:, 1:2] * self.edge2
+        return points, np.full(len(u), self.density * self._area())
+
+    def total_charge(self) -> float:
+        return self.density * self._area()
+
+class Box(Distribution):
+    """Prisma rectangular (losa finita) alineado con los ejes, densidad volumétrica ρ"""
+    dim = 3
+
+    def __init__(self, lo, hi, density: float = 1.0):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = np.asarray(hi, dtype=float)
+        self.density = float(density)
+
+    def sample(self, u):
+        span = self.hi - self.lo
+        return self.lo + u * span, np.full(len(u), self.density * np.prod(span))
+
+    def total_charge(self) -> float:
+        return self.density * float(np.prod(self.hi - self.lo))
+
+class Ball(Distribution):
+    """Esfera maciza uniforme (forma cerrada por el teorema de Gauss)"""
+    dim = 3
+
+    def __init__(self, center, radius: float, density: float = 1.0):
+        self.center = np.asarray(center, dtype=float)
+        self.radius = float(radius)
+        self.density = float(density)
+
+    def sample(self, u):
+        r = self.radius * u[:, 0]
+        theta = np.pi * u[:, 1]
+        phi = 2 * np.pi * u[:, 2]
+        sin_t = np.sin(theta)
+        offsets = np.column_stack((sin_t * np.cos(phi), sin_t * np.sin(phi), np.cos(theta)))
+        jacobian = self.radius * r * r * sin_t * 2 * np.pi * np.pi
+        return self.center + r[:, None] * offsets, self.density * jacobian
+
+    def total_charge(self) -> float:
+        return self.density * 4 / 3 * np.pi * self.radius**3
+
+    def closed_form(self, points):
+        rel = points - self.center
+        r = np.linalg.norm(rel, axis=1)
+        q = self.total_charge()
+        big_r = self.radius
+        inside = r < big_r
+        safe = np.where(inside, big_r, r)
+        field = np.where(inside, q / big_r**3, q / safe**3)[:, None] * rel
+        potential = np.where(inside, q * (3 * big_r**2 - r * r) / (2 * big_r**3), q / safe)
+        return np.ones(len(points), dtype=bool), field, potential
+
+@instrumented('distribuciones.field_and_potential')
+def field_and_potential(points, distributions: Sequence[Distribution], **kwargs
+                        ) -> Tuple[np.ndarray, np.ndarray]:
+    """Suma de campo y potencial de varias distribuciones (kwargs de la cuadratura)"""
+    points = _points(points)
+    field = np.zeros((len(points), 3))
+    potential = np.zeros(len(points))
+    for dist in distributions:
+        e, v = dist.field_and_potential(points, **kwargs)
+        field += e
+        potential += v
+    return field, potential
+
+def electric_field(points, distributions: Sequence[Distribution], **kwargs) -> np.ndarray:
+    return field_and_potential(points, distributions, **kwargs)[0]
+
+def electric_potential(points, distributions: Sequence[Distribution], **kwargs) -> np.ndarray:
+    return field_and_potential(points, distributions, **kwargs)[1]
@@ -0,0 +1,128 @@
+"""Exportación de la tabla resumen de CentroidCalculator a formatos de datos
+
+La tabla (elemento, área con signo, Cx, Cy, A*Cx, A*Cy) se recorre por
+bloques con CentroidCalculator.iter_table y cada bloque se escribe en
+cuanto se genera, así figuras de 10^5 o más elementos no pasan por una
+cadena de texto. Formatos:
+
+    csv      una fila por elemento y una fila final TOTAL
+    jsonl    un objeto JSON por línea, el último con "elemento": "TOTAL"
+    parquet  un grupo de filas por bloque (requiere pyarrow)
+    npy      directorio con un .npy por columna (memmap) y totales.json
+
+En las filas TOTAL, cx y cy son las coordenadas del centroide de la figura.
+get_summary_table() sigue disponible para mostrar figuras pequeñas.
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+COLUMNS = ('elemento', 'area', 'cx', 'cy', 'area_cx', 'area_cy')
+FORMATS = ('csv', 'jsonl', 'parquet', 'npy')
+_SUFFIXES = {'.csv': 'csv', '.jsonl': 'jsonl', '.parquet': 'parquet'}
+
+def _totals_row(calc):
+    total_area, sum_area_x, sum_area_y = calc._totals()
+    centroid_x, centroid_y = calc.calculate_centroid()
+    return ('TOTAL', total_area, centroid_x, centroid_y, sum_area_x, sum_area_y)
+
+def _float_format(precision: Optional[int]) -> str:
+    # repr es exacto (ida y vuelta); con `precision` cifras significativas es más rápido
+    return '{!r}' if precision is None else f'{{:.{precision}g}}'
+
+def _csv_field(name: str) -> str:
+    if any(c in name for c in ',"\r\n'):
+        return '"' + name.replace('"', '""') + '"'
+    return name
+
+def _write_csv(calc, path, chunk_size, precision):
+    row = ','.join(['{}'] + [_float_format(precision)] * 5) + '\n'
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        fh.write(','.join(COLUMNS) + '\n')
+        for names, *columns in calc.iter_table(chunk_size):
+            fh.write(''.join(map(row.format, map(_csv_field, names),
+                                 *(c.tolist() for c in columns))))
+        csv.writer(fh).writerow(_totals_row(calc))
+
+def _jsonl_line(row) -> str:
+    return json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False)
+
+def _write_jsonl(calc, path, chunk_size, precision):
+    # Las claves son fijas: solo el nombre necesita escaparse con json.dumps
+    number = _float_format(precision)
+    row = '{{"elemento": {}' + ''.join(f', "{c}": {number}' for c in COLUMNS[1:]) + '}}\n'
+    dumps = lambda name: json.dumps(name, ensure_ascii=False)
+    with open(path, 'w', encoding='utf-8') as fh:
+        for names, *columns in calc.iter_table(chunk_size):
+            fh.write(''.join(map(row.format, map(dumps, names),
+                                 *(c.tolist() for c in columns))))
+        fh.write(_jsonl_line(_totals_row(calc)) + "\n")
+
+def _write_parquet(calc, path, chunk_size, precision):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("El formato parquet requiere pyarrow; usa 'npy' como "
+                          "alternativa columnar sin dependencias.") from None
+    schema = pa.schema([(COLUMNS[0], pa.string())] + [(c, pa.float64()) for c in COLUMNS[1:]])
+    totals = _totals_row(calc)
+    with pq.ParquetWriter(path, schema) as writer:
+        for names, *columns in calc.iter_table(chunk_size):
+            writer.write_table(pa.table([pa.array(names, pa.string())] + columns,
+                                        schema=schema))
+        writer.write_table(pa.table([[value] for value in totals], schema=schema))
+
+def _write_npy(calc, path, chunk_size, precision):
+    path.mkdir(parents=True, exist_ok=True)
+    n = len(calc)
+    width = max((len(name) for name in calc._names if name is not None), default=1)
+    volumes = {COLUMNS[0]: np.lib.format.open_memmap(path / f"{COLUMNS[0]}.npy", mode='w+',
+                                                     dtype=f'<U{width}', shape=(n,))}
+    for column in COLUMNS[1:]:
+        volumes[column] = np.lib.format.open_memmap(path / f"{column}.npy", mode='w+',
+                                                    dtype=np.float64, shape=(n,))
+    start = 0
+    for chunk in calc.iter_table(chunk_size):
+        stop = start + len(chunk[0])
+        for column, values in zip(COLUMNS, chunk):
+            volumes[column][start:stop] = values
+        start = stop
+    for volume in volumes.values():
+        volume.flush()
+    with open(path / 'totales.json', 'w', encoding='utf-8') as fh:
+        json.dump(dict(zip(COLUMNS, _totals_row(calc))), fh, indent=2, ensure_ascii=False)
+
+_WRITERS = {'csv': _write_csv, 'jsonl': _write_jsonl, 'parquet': _write_parquet,
+            'npy': _write_npy}
+
+def export_table(calc, path, fmt: Optional[str] = None, chunk_size: int = 65536,
+                 precision: Optional[int] = None) -> Path:
+    """Escribe la tabla por elemento y los totales de `calc` en `path`
+
+    fmt: uno de FORMATS; por defecto se deduce de la extensión (.csv, .jsonl,
+        .parquet) y una ruta sin extensión se toma como directorio npy
+    chunk_size: filas generadas y escritas a la vez
+    precision: cifras significativas en csv/jsonl (None = exacto, más lento);
+        parquet y npy guardan siempre float64
+    """
+    path = Path(path)
+    if fmt is None:
+        fmt = _SUFFIXES.get(path.suffix.lower(), 'npy' if not path.suffix else None)
+    if fmt not in _WRITERS:
+        raise ValueError(f"Formato no soportado: {fmt or path.suffix}")
+    if not len(calc):
+        raise ValueError("No hay elementos definidos.")
+    _WRITERS[fmt](calc, path, chunk_size, precision)
+    return path
+
+def load_npy_table(path, mmap_mode: Optional[str] = 'r'):
+    """Lee una tabla exportada en formato npy: (columnas, totales)"""
+    path = Path(path)
+    columns = {column: np.load(path / f"{column}.npy", mmap_mode=mmap_mode)
+               for column in COLUMNS}
+    with open(path / 'totales.json', encoding='utf-8') as fh:
+        return columns, json.load(fh)
@@ -0,0 +1,256 @@
+"""Figuras compuestas anidadas con transformaciones y momentos en caché
+
+Una Composite contiene grupos de instancias de subfiguras, que pueden ser
+CentroidCalculator (elementos primitivos) u otras Composite. Cada grupo
+guarda en arreglos la traslación, el giro, el espejo y el signo de cada
+instancia, de modo que 10^4 instancias de una misma subsección se combinan
+con unas pocas operaciones vectorizadas: el costo es O(instancias), no
+O(instancias × elementos).
+
+Las propiedades se propagan como (A, punto de referencia p, primer momento
+m = ∫(x-p) dA, segundo momento J = ∫(x-p)(x-p)ᵀ dA), con área y momentos
+con signo. Bajo x' = S x + t, con S = R M (M espejo respecto al eje X,
+R giro):
+    p' = S p + t
+    m' = S m
+    J' = S J Sᵀ
+y las instancias se suman con el teorema de ejes paralelos respecto a un
+punto de referencia local, nunca respecto al origen: así una sección lejos
+del origen no pierde precisión por cancelación (∫y² - A ȳ²). El primer
+momento se guarda en lugar del centroide porque una subfigura con área
+neta nula (un agujero "movido": +hueco en un lugar, -hueco en otro) no
+tiene centroide pero sí aporta m y J. Cada Composite guarda en caché sus
+momentos junto con la "revisión" de sus hijos; solo se recalculan cuando
+ella o algún descendiente cambió.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from centroide_fig_compuesta_v2 import (CentroidCalculator, SectionProperties, Shape,
+                                        section_properties_from_moments)
+
+Child = Union[CentroidCalculator, 'Composite']
+
+@dataclass(frozen=True)
+class Transform:
+    """Espejo opcional respecto al eje X, luego giro (radianes) y traslación"""
+    dx: float = 0.0
+    dy: float = 0.0
+    angle: float = 0.0
+    mirror: bool = False
+
+@dataclass(eq=False)
+class _Group:
+    """Instancias de una misma subfigura"""
+    child: Child
+    dx: np.ndarray
+    dy: np.ndarray
+    angle: np.ndarray
+    mirror: np.ndarray
+    sign: np.ndarray
+    name: str
+
+    def rotation(self) -> Tuple[np.ndarray, ...]:
+        """Coeficientes (r11, r12, r21, r22) de R·M para cada instancia"""
+        c, s = np.cos(self.angle), np.sin(self.angle)
+        mu = np.where(self.mirror, -1.0, 1.0)
+        return c, -s * mu, s, c * mu
+
+def _combine(a, px, py, mx, my, jxx, jyy, jxy) -> np.ndarray:
+    """Suma partes (área, referencia, primer y segundo momento, todo con signo)
+
+    Devuelve (A, px, py, Mx, My, Jxx, Jyy, Jxy) con los momentos referidos a
+    la media de los puntos de referencia de las partes.
+    """
+    if a.size == 0:
+        return np.zeros(8)
+    ref_x, ref_y = px.mean(), py.mean()
+    ux, uy = px - ref_x, py - ref_y
+    return np.array([a.sum(), ref_x, ref_y,
+                     mx.sum() + a @ ux,
+                     my.sum() + a @ uy,
+                     jxx.sum() + 2 * (mx @ ux) + a @ (ux * ux),
+                     jyy.sum() + 2 * (my @ uy) + a @ (uy * uy),
+                     jxy.sum() + mx @ uy + my @ ux + a @ (ux * uy)])
+
+def calculator_moments(calc: CentroidCalculator) -> np.ndarray:
+    """(A, px, py, Mx, My, Jxx, Jyy, Jxy) de una figura plana, para _combine"""
+    n = calc._size
+    area, cx, cy, sign, ix, iy, ixy = calc._data[:, :n]
+    live = sign != 0
+    sign = sign[live]
+    zeros = np.zeros(sign.size)
+    # Cada elemento se refiere a su propio centroide: primer momento nulo
+    return _combine(area[live] * sign, cx[live], cy[live], zeros, zeros,
+                    sign * iy[live], sign * ix[live], sign * ixy[live])
+
+def transform_moments(moments: np.ndarray, group: _Group) -> Tuple[np.ndarray, ...]:
+    """Partes (a, px, py, mx, my, jxx, jyy, jxy) de cada instancia del grupo"""
+    a, px, py, mx, my, jxx, jyy, jxy = moments
+    r11, r12, r21, r22 = group.rotation()
+    sign = group.sign
+    new_jxx = r11 * r11 * jxx + 2 * r11 * r12 * jxy + r12 * r12 * jyy
+    new_jyy = r21 * r21 * jxx + 2 * r21 * r22 * jxy + r22 * r22 * jyy
+    new_jxy = r11 * r21 * jxx + (r11 * r22 + r12 * r21) * jxy + r12 * r22 * jyy
+    return (sign * a,
+            r11 * px + r12 * py + group.dx,
+            r21 * px + r22 * py + group.dy,
+            sign * (r11 * mx + r12 * my),
+            sign * (r21 * mx + r22 * my),
+            sign * new_jxx, sign * new_jyy, sign * new_jxy)
+
+class Composite:
+    """Figura formada por instancias transformadas de otras figuras"""
+
+    def __init__(self, name: str = 'figura'):
+        self.name = name
+        self._groups: List[_Group] = []
+        self._version = 0
+        self._cache: Optional[np.ndarray] = None
+        self._cache_revision = None
+
+    def __len__(self) -> int:
+        """Cantidad de instancias directas"""
+        return sum(len(group.sign) for group in self._groups)
+
+    def _contains(self, other: 'Composite') -> bool:
+        if other is self:
+            return True
+        return any(isinstance(group.child, Composite) and group.child._contains(other)
+                   for group in self._groups)
+
+    def add(self, child: Child, transform: Transform = Transform(), is_positive: bool = True,
+            name: Optional[str] = None) -> int:
+        """Agrega una instancia de `child`; devuelve el índice del grupo"""
+        return self.add_instances(child, transform.dx, transform.dy, transform.angle,
+                                  transform.mirror, is_positive, name)
+
+    def add_instances(self, child: Child, dx, dy, angle=0.0, mirror=False, is_positive=True,
+                      name: Optional[str] = None) -> int:
+        """Agrega muchas instancias de `child` a la vez a partir de arreglos
+
+        dx, dy, angle, mirror, is_positive: escalares o arreglos 1D (se difunden)
+        Devuelve el índice del grupo creado.
+        """
+        if isinstance(child, Composite) and child._contains(self):
+            raise ValueError("Una figura no puede contenerse a sí misma.")
+        if not isinstance(child, (Composite, CentroidCalculator)):
+            raise TypeError("El hijo debe ser una Composite o una CentroidCalculator.")
+        columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float))
+                                        for v in (dx, dy, angle, mirror, is_positive)))
+        dx, dy, angle, mirror, positive = (np.array(c) for c in columns)
+        if name is None:
+            name = getattr(child, 'name', f"parte{len(self._groups)}")
+        self._groups.append(_Group(child, dx, dy, angle, mirror != 0,
+                                   np.where(positive != 0, 1.0, -1.0), name))
+        self._version += 1
+        return len(self._groups) - 1
+
+    def remove(self, index: int) -> Child:
+        """Quita el grupo `index` y devuelve su subfigura"""
+        group = self._groups.pop(index)
+        self._version += 1
+        return group.child
+
+    def revision(self):
+        """Valor que cambia cuando esta figura o alguno de sus descendientes cambia"""
+        seen = {}
+        for group in self._groups:
+            child = group.child
+            if id(child) not in seen:
+                seen[id(child)] = (child.revision() if isinstance(child, Composite)
+                                   else child._version)
+        return self._version, tuple(seen.items())
+
+    def moments(self) -> np.ndarray:
+        """(A, px, py, Mx, My, Jxx, Jyy, Jxy), desde la caché si sigue vigente
+
+        Los momentos están referidos al punto (px, py); ver _combine.
+        """
+        revision = self.revision()
+        if self._cache is not None and self._cache_revision == revision:
+            return self._cache
+        parts = []
+        child_moments = {}
+        for group in self._groups:
+            key = id(group.child)
+            if key not in child_moments:
+                child = group.child
+                child_moments[key] = (child.moments() if isinstance(child, Composite)
+                                      else calculator_moments(child))
+            parts.append(np.broadcast_arrays(*transform_moments(child_moments[key], group)))
+        total = _combine(*(np.concatenate(column) for column in zip(*parts))) if parts \
+            else np.zeros(8)
+        self._cache = total
+        self._cache_revision = revision
+        return total
+
+    def calculate_centroid(self) -> Tuple[float, float]:
+        """Centroide de la figura completa"""
+        area, px, py, mx, my = self.moments()[:5]
+        if not self._groups:
+            return 0.0, 0.0
+        if area == 0:
+            raise ValueError("El área total es cero. Revisa los elementos.")
+        return float(px + mx / area), float(py + my / area)
+
+    def calculate_section_properties(self) -> SectionProperties:
+        """Área, centroide, inercias centroidales y ejes principales"""
+        area, px, py, mx, my, jxx, jyy, jxy = self.moments()
+        if area == 0:
+            raise ValueError("El área total es cero. Revisa los elementos.")
+        return section_properties_from_moments(px, py, area, mx, my, jxx, jyy, jxy)
+
+    def flatten(self) -> CentroidCalculator:
+        """Expande todas las instancias en una CentroidCalculator plana
+
+        Los nombres son rutas 'grupo[k]/elemento'. Útil para graficar o
+        verificar; el costo es proporcional al total de elementos.
+        """
+        calc = CentroidCalculator()
+        for group in self._groups:
+            child = group.child.flatten() if isinstance(group.child, Composite) else group.child
+            _append_transformed(calc, child, group)
+        return calc
+
+def _transform_shape(shape: Optional[Shape], r, t, mirrored: bool) -> Optional[Shape]:
+    if shape is None:
+        return None
+    params = np.asarray(shape.params, dtype=float)
+    if shape.kind == 'polygon':
+        vertices = params @ r.T + t
+        return Shape('polygon', vertices[::-1] if mirrored else vertices)
+    center = r @ params[:2] + t
+    if shape.kind == 'circle':
+        return Shape('circle', np.array([center[0], center[1], params[2]]))
+    if shape.kind == 'semicircle':
+        direction = r @ np.array([np.cos(params[3]), np.sin(params[3])])
+        return Shape('semicircle', np.array([center[0], center[1], params[2],
+                                             np.arctan2(direction[1], direction[0])]))
+    # Un rectángulo girado deja de estar alineado con los ejes: pasa a polígono
+    cx, cy, w, h = params
+    corners = np.array([[-w, -h], [w, -h], [w, h], [-w, h]]) / 2 + (cx, cy)
+    return _transform_shape(Shape('polygon', corners), r, t, mirrored)
+
+def _append_transformed(calc: CentroidCalculator, child: CentroidCalculator, group: _Group):
+    """Agrega a calc los elementos de child transformados por cada instancia del grupo"""
+    child._compact()
+    n = len(child)
+    area, cx, cy, sign, ix, iy, ixy = child._data[:, :n]
+    for k, (r11, r12, r21, r22) in enumerate(zip(*(np.broadcast_to(c, group.sign.shape)
+                                                   for c in group.rotation()))):
+        r = np.array([[r11, r12], [r21, r22]])
+        t = np.array([group.dx[k], group.dy[k]])
+        x = r11 * cx + r12 * cy + t[0]
+        y = r21 * cx + r22 * cy + t[1]
+        # Tensor centroidal de cada elemento: [[∫x², ∫xy], [∫xy, ∫y²]] = [[iy, ixy], [ixy, ix]]
+        new_iy = r11 * r11 * iy + 2 * r11 * r12 * ixy + r12 * r12 * ix
+        new_ix = r21 * r21 * iy + 2 * r21 * r22 * ixy + r22 * r22 * ix
+        new_ixy = r11 * r21 * iy + (r11 * r22 + r12 * r21) * ixy + r12 * r22 * ix
+        mirrored = bool(group.mirror[k])
+        names = [f"{group.name}[{k}]/{name}" for name in child._names]
+        shapes = [_transform_shape(shape, r, t, mirrored) for shape in child._shapes]
+        calc.add_many(names, area, x, y, (sign > 0) == (group.sign[k] > 0),
+                      new_ix, new_iy, new_ixy, shapes)
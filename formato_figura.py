@@ -0,0 +1,234 @@
+"""Formato binario para figuras compuestas, legible con np.memmap sin copias
+
+Un archivo .cfig guarda una biblioteca de una o más figuras
+(CentroidCalculator) con todos sus elementos ya calculados:
+
+    cabecera     64 bytes: firma, versión y cantidades
+    offsets      int64 (n_figuras + 1): elementos de la figura k en
+                 offsets[k]:offsets[k+1]
+    registros    RECORD_DTYPE (96 bytes por elemento): tipo, signo, nombre
+                 (posición y largo en la tabla de cadenas), parámetros de la
+                 geometría, área, centroide y momentos de inercia
+    vértices     float64 (n_vértices, 2) de los polígonos
+    nombres      tabla de cadenas UTF-8 concatenadas
+
+Todas las secciones empiezan en múltiplos de 8 bytes, de modo que
+load_library solo lee la cabecera y crea vistas memmap: abrir una
+biblioteca es instantáneo y el centroide se calcula directamente sobre el
+búfer mapeado. Las geometrías 'polygon' guardan en params
+(primer vértice, cantidad de vértices).
+"""
+import struct
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from centroide_fig_compuesta_v2 import (BatchCentroidCalculator, CentroidCalculator, Shape,
+                                        _AREA, _CX, _CY, _IX, _IXY, _IY, _SIGN)
+
+MAGIC = b'CFIG'
+VERSION = 1
+# Firma, versión, n_figuras, n_registros, n_vértices, bytes de nombres
+_HEADER = struct.Struct('<4sIQQQQ')
+_HEADER_SIZE = 64
+
+KINDS = (None, 'rectangle', 'circle', 'semicircle', 'polygon')
+RECORD_DTYPE = np.dtype([
+    ('kind', 'u1'),
+    ('sign', 'i1'),
+    ('reserved', 'u2'),
+    ('name_length', '<u4'),
+    ('name_offset', '<u8'),
+    ('params', '<f8', (4,)),
+    ('area', '<f8'),
+    ('cx', '<f8'),
+    ('cy', '<f8'),
+    ('ix', '<f8'),
+    ('iy', '<f8'),
+    ('ixy', '<f8'),
+])
+
+def _aligned(n: int) -> int:
+    return (n + 7) // 8 * 8
+
+def _records(calc: CentroidCalculator, vertex_start: int, name_start: int
+             ) -> Tuple[np.ndarray, List[np.ndarray], List[bytes]]:
+    """Registros de una figura, más sus vértices y nombres codificados"""
+    calc._compact()
+    n = len(calc)
+    records = np.zeros(n, dtype=RECORD_DTYPE)
+    data = calc._data[:, :n]
+    for field, row in (('area', _AREA), ('cx', _CX), ('cy', _CY), ('ix', _IX),
+                       ('iy', _IY), ('ixy', _IXY)):
+        records[field] = data[row]
+    records['sign'] = np.sign(data[_SIGN])
+
+    encoded = [name.encode('utf-8') for name in calc._names]
+    lengths = np.fromiter(map(len, encoded), dtype=np.uint64, count=n)
+    records['name_length'] = lengths
+    records['name_offset'] = name_start + np.cumsum(lengths) - lengths
+
+    vertices = []
+    for i, shape in enumerate(calc._shapes):
+        if shape is None:
+            continue
+        records['kind'][i] = KINDS.index(shape.kind)
+        if shape.kind == 'polygon':
+            polygon = np.asarray(shape.params, dtype=float).reshape(-1, 2)
+            records['params'][i, :2] = (vertex_start, len(polygon))
+            vertex_start += len(polygon)
+            vertices.append(polygon)
+        else:
+            params = np.asarray(shape.params, dtype=float)
+            records['params'][i, :params.size] = params
+    return records, vertices, encoded
+
+def save_library(calculators: Sequence[CentroidCalculator], path) -> Path:
+    """Guarda varias figuras en un solo archivo .cfig"""
+    path = Path(path)
+    offsets = [0]
+    all_records, all_vertices, all_names = [], [], []
+    n_vertices = 0
+    name_bytes = 0
+    for calc in calculators:
+        records, vertices, names = _records(calc, n_vertices, name_bytes)
+        all_records.append(records)
+        all_vertices.extend(vertices)
+        all_names.extend(names)
+        n_vertices += sum(len(v) for v in vertices)
+        name_bytes += sum(map(len, names))
+        offsets.append(offsets[-1] + len(records))
+
+    records = np.concatenate(all_records) if all_records else np.zeros(0, RECORD_DTYPE)
+    vertices = np.concatenate(all_vertices) if all_vertices else np.zeros((0, 2))
+    with open(path, 'wb') as fh:
+        header = _HEADER.pack(MAGIC, VERSION, len(calculators), len(records), n_vertices,
+                              name_bytes)
+        fh.write(header.ljust(_HEADER_SIZE, b'\0'))
+        fh.write(np.asarray(offsets, dtype='<i8').tobytes())
+        fh.write(records.tobytes())
+        fh.write(vertices.astype('<f8').tobytes())
+        fh.write(b''.join(all_names))
+    return path
+
+def save_figure(calc: CentroidCalculator, path) -> Path:
+    """Guarda una figura (biblioteca de una sola figura)"""
+    return save_library([calc], path)
+
+class MappedFigure:
+    """Figura leída de un archivo .cfig: vistas sin copia sobre el memmap"""
+
+    def __init__(self, records: np.ndarray, vertices: np.ndarray, names: np.ndarray):
+        self.records = records
+        self.vertices = vertices
+        self._names = names
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def name(self, i: int) -> str:
+        record = self.records[i]
+        start = int(record['name_offset'])
+        return bytes(self._names[start:start + int(record['name_length'])]).decode('utf-8')
+
+    def names(self) -> List[str]:
+        if not len(self.records):
+            return []
+        start = int(self.records['name_offset'][0])
+        stop = int(self.records['name_offset'][-1] + self.records['name_length'][-1])
+        blob = bytes(self._names[start:stop])
+        ends = (self.records['name_offset'] + self.records['name_length'] - start).tolist()
+        begins = (self.records['name_offset'] - start).tolist()
+        return [blob[b:e].decode('utf-8') for b, e in zip(begins, ends)]
+
+    def shape(self, i: int) -> Optional[Shape]:
+        record = self.records[i]
+        kind = KINDS[record['kind']]
+        if kind is None:
+            return None
+        params = record['params']
+        if kind == 'polygon':
+            start, count = int(params[0]), int(params[1])
+            return Shape(kind, self.vertices[start:start + count])
+        return Shape(kind, np.array(params[:3 if kind == 'circle' else 4]))
+
+    def calculate_totals(self) -> Tuple[float, float, float]:
+        """(ΣA, ΣA·Cx, ΣA·Cy) calculados sobre el búfer mapeado"""
+        signed = self.records['area'] * self.records['sign']
+        return (float(signed.sum()), float(signed @ self.records['cx']),
+                float(signed @ self.records['cy']))
+
+    def calculate_centroid(self) -> Tuple[float, float]:
+        """Centroide de la figura, igual que CentroidCalculator.calculate_centroid"""
+        if not len(self.records):
+            return 0.0, 0.0
+        total_area, sum_area_x, sum_area_y = self.calculate_totals()
+        if total_area == 0:
+            raise ValueError("El área total es cero. Revisa los elementos.")
+        return sum_area_x / total_area, sum_area_y / total_area
+
+    def to_calculator(self) -> CentroidCalculator:
+        """Reconstruye una CentroidCalculator (copia los datos a memoria)"""
+        records = self.records
+        calc = CentroidCalculator()
+        calc.add_many(self.names(), records['area'], records['cx'], records['cy'],
+                      records['sign'] > 0, records['ix'], records['iy'], records['ixy'],
+                      [self.shape(i) for i in range(len(records))])
+        return calc
+
+class MappedLibrary:
+    """Biblioteca de figuras abierta con np.memmap"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as fh:
+            header = fh.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Archivo .cfig truncado: {self.path}")
+        magic, version, n_figures, n_records, n_vertices, name_bytes = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"No es un archivo .cfig: {self.path}")
+        if version != VERSION:
+            raise ValueError(f"Versión de .cfig no soportada: {version}")
+
+        def section(dtype, shape, offset):
+            if not np.prod(shape):
+                return np.zeros(shape, dtype=dtype)
+            return np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+        offset = _HEADER_SIZE
+        self.offsets = section('<i8', (n_figures + 1,), offset)
+        offset += _aligned(self.offsets.nbytes)
+        self.records = section(RECORD_DTYPE, (n_records,), offset)
+        offset += n_records * RECORD_DTYPE.itemsize
+        self.vertices = section('<f8', (n_vertices, 2), offset)
+        offset += n_vertices * 16
+        self._names = section(np.uint8, (name_bytes,), offset)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, k: int) -> MappedFigure:
+        if not -len(self) <= k < len(self):
+            raise IndexError(k)
+        k %= len(self)
+        start, stop = int(self.offsets[k]), int(self.offsets[k + 1])
+        return MappedFigure(self.records[start:stop], self.vertices, self._names)
+
+    def to_batch(self) -> BatchCentroidCalculator:
+        """Lote con todas las figuras, sobre las columnas mapeadas"""
+        records = self.records
+        return BatchCentroidCalculator(records['area'], records['cx'], records['cy'],
+                                       np.asarray(self.offsets), records['sign'] > 0)
+
+    def calculate_centroids(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(áreas, centroides_x, centroides_y) de todas las figuras"""
+        return self.to_batch().calculate_centroids()
+
+def load_library(path) -> MappedLibrary:
+    return MappedLibrary(path)
+
+def load_figure(path, k: int = 0) -> MappedFigure:
+    """Abre la figura k (por defecto la única) de un archivo .cfig"""
+    return MappedLibrary(path)[k]
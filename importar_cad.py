@@ -0,0 +1,663 @@
+"""Importación de dibujos SVG y DXF (ASCII) a CentroidCalculator
+
+Los archivos se leen en streaming: el DXF par a par (código de grupo,
+valor) y el SVG con iterparse, descartando cada nodo ya procesado, de modo
+que la memoria no depende del tamaño del archivo sino de lo que aún no se
+ha entregado a la calculadora. Las regiones se acumulan y se agregan en
+bloques de batch_size con add_polygons / add_many.
+
+Entidades reconocidas:
+    DXF  CIRCLE (exacto), LWPOLYLINE y POLYLINE cerradas (con bulges),
+         LINE y ARC (se encadenan por sus extremos hasta cerrar un contorno)
+    SVG  circle y rect (exactos si la transformación lo permite), path
+         (M, L, H, V, C, S, Q, T, A, Z), polygon, ellipse
+
+Arcos y curvas se aproximan con polígonos: arc_tolerance es la flecha
+máxima relativa al radio (arcos) o al largo del polígono de control
+(curvas de Bézier).
+
+Huecos: por capa (hole_layers; capa DXF o etiqueta/id del grupo SVG más
+cercano) y/o por sentido de giro (winding_holes). En DXF el giro no es
+confiable (los contornos macizos se dibujan en cualquier sentido), por lo
+que por defecto solo cuenta la capa; con winding_holes=True restan las
+polilíneas cerradas en sentido horario. Los contornos armados con LINE/ARC
+no tienen sentido propio y solo restan por capa. En SVG, dentro de un mismo
+<path>, restan los subtrayectos con giro opuesto al de mayor área (regla
+nonzero). Los círculos y rectángulos exactos solo restan por capa. En SVG
+el eje Y apunta hacia abajo; con flip_y (por defecto) se invierte. No se
+interpretan bloques DXF (INSERT), unidades ni viewBox.
+"""
+import math
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from centroide_fig_compuesta_v2 import CentroidCalculator, Shape
+from metricas import instrumented
+
+DEFAULT_BATCH_SIZE = 8192
+DEFAULT_ARC_TOLERANCE = 1e-4
+
+@dataclass
+class ImportResult:
+    """Cantidad de regiones agregadas y de entidades descartadas"""
+    polygons: int = 0
+    circles: int = 0
+    rectangles: int = 0
+    open_paths: int = 0      # contornos sin cerrar (no aportan área)
+    skipped: int = 0         # entidades no soportadas o degeneradas
+
+def _arc_points(cx, cy, r, start, sweep, tolerance) -> np.ndarray:
+    """Puntos de un arco desde el ángulo start (radianes) con barrido sweep, extremos incluidos"""
+    step = 2 * math.acos(max(1 - tolerance, -1.0))
+    n = max(1, math.ceil(abs(sweep) / step))
+    angles = start + sweep * np.arange(n + 1) / n
+    return np.column_stack((cx + r * np.cos(angles), cy + r * np.sin(angles)))
+
+def _bulge_points(p0, p1, bulge, tolerance) -> list:
+    """Arco de una polilínea DXF entre p0 y p1 (sin p0); bulge = tan(ángulo/4)"""
+    if bulge == 0:
+        return [p1]
+    sweep = 4 * math.atan(bulge)
+    chord = math.hypot(p1[0] - p0[0], p1[1] - p0[1])
+    r = chord / (2 * abs(math.sin(sweep / 2)))
+    # Centro a la izquierda de la cuerda para bulge > 0 (giro antihorario)
+    mx, my = (p0[0] + p1[0]) / 2, (p0[1] + p1[1]) / 2
+    offset = r * math.cos(sweep / 2) * math.copysign(1, bulge)
+    nx, ny = -(p1[1] - p0[1]) / chord, (p1[0] - p0[0]) / chord
+    cx, cy = mx + offset * nx, my + offset * ny
+    start = math.atan2(p0[1] - cy, p0[0] - cx)
+    return _arc_points(cx, cy, r, start, sweep, tolerance)[1:].tolist()
+
+def _orientation(coords: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Doble del área con signo de cada polígono empaquetado"""
+    x, y = coords[:, 0], coords[:, 1]
+    nxt = np.arange(1, len(coords) + 1)
+    nxt[offsets[1:] - 1] = offsets[:-1]
+    cross = x * y[nxt] - x[nxt] * y
+    return np.add.reduceat(cross, offsets[:-1])
+
+class _Feeder:
+    """Acumula regiones y las agrega a la calculadora por bloques"""
+
+    def __init__(self, calc: CentroidCalculator, hole_layers: Collection[str],
+                 winding_holes: bool, batch_size: int, result: ImportResult):
+        self.calc = calc
+        self.hole_layers = set(hole_layers)
+        self.winding_holes = winding_holes
+        self.batch_size = batch_size
+        self.result = result
+        self.polygons: List[np.ndarray] = []
+        self.polygon_names: List[str] = []
+        self.polygon_holes: List[bool] = []
+        self.polygon_winding: List[Optional[bool]] = []
+        self.primitives: List[Tuple[str, Shape, bool]] = []
+
+    def polygon(self, name: str, layer: str, points: np.ndarray,
+                winding_hole: Optional[bool] = None):
+        """winding_hole: hueco por giro ya decidido; None lo decide el sentido horario"""
+        points = np.asarray(points, dtype=float)
+        if len(points) > 1 and (points[0] == points[-1]).all():
+            points = points[:-1]
+        if len(points) < 3:
+            self.result.skipped += 1
+            return
+        self.polygons.append(points)
+        self.polygon_names.append(name)
+        self.polygon_holes.append(layer in self.hole_layers)
+        self.polygon_winding.append(winding_hole)
+        if len(self.polygons) >= self.batch_size:
+            self._flush_polygons()
+
+    def circle(self, name: str, layer: str, cx: float, cy: float, r: float):
+        self._primitive(name, Shape('circle', np.array([cx, cy, r])), layer)
+
+    def rectangle(self, name: str, layer: str, cx: float, cy: float, w: float, h: float):
+        self._primitive(name, Shape('rectangle', np.array([cx, cy, w, h])), layer)
+
+    def _primitive(self, name, shape, layer):
+        if np.any(shape.params[2:] <= 0):
+            self.result.skipped += 1
+            return
+        self.primitives.append((name, shape, layer in self.hole_layers))
+        if len(self.primitives) >= self.batch_size:
+            self._flush_primitives()
+
+    def _flush_polygons(self):
+        if not self.polygons:
+            return
+        counts = np.fromiter(map(len, self.polygons), dtype=np.intp, count=len(self.polygons))
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        coords = np.concatenate(self.polygons)
+        twice_area = _orientation(coords, offsets)
+        valid = twice_area != 0
+        positive = ~np.array(self.polygon_holes)
+        if self.winding_holes:
+            winding = np.array([twice_area[i] < 0 if hole is None else hole
+                                for i, hole in enumerate(self.polygon_winding)], dtype=bool)
+            positive &= ~winding
+        if not valid.all():
+            self.result.skipped += int((~valid).sum())
+            keep = np.repeat(valid, counts)
+            coords, counts = coords[keep], counts[valid]
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            self.polygon_names = [n for n, v in zip(self.polygon_names, valid.tolist()) if v]
+            positive = positive[valid]
+        if len(counts):
+            self.calc.add_polygons(self.polygon_names, coords, offsets, positive)
+        self.result.polygons += len(counts)
+        self.polygons, self.polygon_names = [], []
+        self.polygon_holes, self.polygon_winding = [], []
+
+    def _flush_primitives(self):
+        if not self.primitives:
+            return
+        names, shapes, holes = zip(*self.primitives)
+        circles = np.array([s.kind == 'circle' for s in shapes])
+        params = np.zeros((len(shapes), 4))
+        for i, shape in enumerate(shapes):
+            params[i, :len(shape.params)] = shape.params
+        cx, cy, a, b = params.T
+        # Círculo: a = radio; rectángulo: a = ancho, b = alto
+        area = np.where(circles, np.pi * a * a, a * b)
+        ix = np.where(circles, np.pi * a**4 / 4, a * b**3 / 12)
+        iy = np.where(circles, np.pi * a**4 / 4, b * a**3 / 12)
+        self.calc.add_many(list(names), area, cx, cy, ~np.array(holes), ix, iy, 0.0,
+                           list(shapes))
+        self.result.circles += int(circles.sum())
+        self.result.rectangles += int((~circles).sum())
+        self.primitives = []
+
+    def flush(self):
+        self._flush_polygons()
+        self._flush_primitives()
+
+class _Chainer:
+    """Une tramos abiertos (LINE, ARC) por extremos coincidentes hasta cerrar contornos"""
+
+    def __init__(self, snap: float):
+        self.snap = snap
+        self.ends: Dict[Tuple[int, int], list] = {}
+
+    def _key(self, point) -> Tuple[int, int]:
+        return round(point[0] / self.snap), round(point[1] / self.snap)
+
+    def _take(self, key):
+        """Quita la cadena con un extremo en key; la devuelve orientada para empezar en key"""
+        chain = self.ends.pop(key, None)
+        if chain is None:
+            return None
+        layer, points, first, last = chain
+        if first == key:
+            self.ends.pop(last, None)
+            return layer, points, last
+        self.ends.pop(first, None)
+        return layer, points[::-1], first
+
+    def add(self, layer: str, points: List[Tuple[float, float]]
+            ) -> Optional[Tuple[str, List[Tuple[float, float]]]]:
+        """Agrega un tramo; devuelve (capa, contorno sin el punto de cierre) si lo cierra"""
+        first, last = self._key(points[0]), self._key(points[-1])
+        joined = self._take(first)
+        if joined is not None:
+            layer, head, first = joined
+            points = head[::-1] + points[1:]
+        if first != last:
+            joined = self._take(last)
+            if joined is not None:
+                _, tail, last = joined
+                points = points + tail[1:]
+        if first == last:
+            return (layer, points[:-1]) if len(points) > 3 else None
+        entry = [layer, points, first, last]
+        self.ends[first] = entry
+        self.ends[last] = entry
+        return None
+
+    def open_chains(self) -> int:
+        return len(self.ends) // 2
+
+def _dxf_pairs(fh) -> Iterator[Tuple[int, str]]:
+    """Pares (código de grupo, valor) de un DXF ASCII, línea a línea"""
+    lines = iter(fh)
+    for number, code in enumerate(lines, start=1):
+        value = next(lines, '')
+        try:
+            yield int(code), value.strip()
+        except ValueError:
+            raise ValueError(f"DXF inválido: código de grupo '{code.strip()}' "
+                             f"en el par {number}.") from None
+
+def _dxf_entities(fh) -> Iterator[Tuple[str, List[Tuple[int, str]]]]:
+    """(tipo, pares de grupo) de cada entidad de la sección ENTITIES"""
+    in_entities = False
+    kind, groups = None, []
+    previous = None
+    for code, value in _dxf_pairs(fh):
+        if code == 0:
+            if kind is not None:
+                yield kind, groups
+            kind, groups = None, []
+            if value == 'ENDSEC':
+                in_entities = False
+            elif in_entities:
+                kind = value
+        elif code == 2 and previous == (0, 'SECTION'):
+            in_entities = value == 'ENTITIES'
+        elif kind is not None:
+            groups.append((code, value))
+        previous = (code, value)
+    if kind is not None:
+        yield kind, groups
+
+def _closed_polyline(vertices, bulges, tolerance) -> list:
+    """Contorno de una polilínea cerrada con los arcos de los bulges ya discretizados"""
+    points = [vertices[0]]
+    n = len(vertices)
+    for i in range(n):
+        points.extend(_bulge_points(vertices[i], vertices[(i + 1) % n], bulges[i], tolerance))
+    return points[:-1]
+
+@instrumented('importar.dxf')
+def import_dxf(path, calc: Optional[CentroidCalculator] = None, *,
+               hole_layers: Collection[str] = (), winding_holes: bool = False,
+               arc_tolerance: float = DEFAULT_ARC_TOLERANCE, snap: float = 1e-6,
+               batch_size: int = DEFAULT_BATCH_SIZE
+               ) -> Tuple[CentroidCalculator, ImportResult]:
+    """Agrega a `calc` (o a una calculadora nueva) las regiones de un DXF ASCII
+
+    snap: distancia bajo la cual dos extremos de LINE/ARC se consideran unidos
+    """
+    calc = CentroidCalculator() if calc is None else calc
+    result = ImportResult()
+    feeder = _Feeder(calc, hole_layers, winding_holes, batch_size, result)
+    chainer = _Chainer(snap)
+    polyline = None      # POLYLINE antigua: (nombre, capa, cerrada, vértices, bulges)
+    count = 0
+
+    with open(path, encoding='utf-8', errors='replace') as fh:
+        for kind, groups in _dxf_entities(fh):
+            count += 1
+            first = {}
+            for code, value in groups:
+                first.setdefault(code, value)
+            layer = first.get(8, '0')
+            name = f"{layer}:{first.get(5, count)}"
+            number = lambda code, default=0.0: float(first.get(code, default))
+
+            if kind == 'CIRCLE':
+                feeder.circle(name, layer, number(10), number(20), number(40))
+            elif kind == 'LWPOLYLINE':
+                vertices, bulges = [], []
+                for code, value in groups:
+                    if code == 10:
+                        vertices.append([float(value), 0.0])
+                        bulges.append(0.0)
+                    elif code == 20:
+                        vertices[-1][1] = float(value)
+                    elif code == 42 and vertices:
+                        bulges[-1] = float(value)
+                closed = int(first.get(70, 0)) & 1
+                if not closed or len(vertices) < 2:
+                    result.open_paths += 1
+                    continue
+                feeder.polygon(name, layer, _closed_polyline(vertices, bulges, arc_tolerance))
+            elif kind == 'POLYLINE':
+                polyline = (name, layer, int(first.get(70, 0)) & 1, [], [])
+            elif kind == 'VERTEX' and polyline is not None:
+                polyline[3].append([number(10), number(20)])
+                polyline[4].append(number(42))
+            elif kind == 'SEQEND' and polyline is not None:
+                name, layer, closed, vertices, bulges = polyline
+                polyline = None
+                if not closed or len(vertices) < 2:
+                    result.open_paths += 1
+                    continue
+                feeder.polygon(name, layer, _closed_polyline(vertices, bulges, arc_tolerance))
+            elif kind in ('LINE', 'ARC'):
+                if kind == 'LINE':
+                    piece = [(number(10), number(20)), (number(11), number(21))]
+                else:
+                    start, end = math.radians(number(50)), math.radians(number(51))
+                    sweep = (end - start) % (2 * math.pi) or 2 * math.pi
+                    piece = _arc_points(number(10), number(20), number(40), start, sweep,
+                                        arc_tolerance).tolist()
+                closed = chainer.add(layer, piece)
+                if closed is not None:
+                    feeder.polygon(f"{closed[0]}:contorno{count}", *closed, winding_hole=False)
+            else:
+                result.skipped += 1
+    feeder.flush()
+    result.open_paths += chainer.open_chains()
+    return calc, result
+
+# --- SVG ---
+
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_PATH_TOKEN = re.compile(rf'([MmLlHhVvCcSsQqTtAaZz])|({_NUMBER})')
+_TRANSFORM = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+_ARGUMENTS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+
+def _numbers(text: str) -> List[float]:
+    return [float(v) for v in re.findall(_NUMBER, text or '')]
+
+def _parse_transform(text: Optional[str]) -> np.ndarray:
+    """Matriz afín 3×3 de un atributo transform de SVG"""
+    matrix = np.eye(3)
+    for kind, args in _TRANSFORM.findall(text or ''):
+        v = _numbers(args)
+        m = np.eye(3)
+        if kind == 'matrix':
+            m[:2] = np.array(v[:6]).reshape(3, 2).T
+        elif kind == 'translate':
+            m[:2, 2] = (v[0], v[1] if len(v) > 1 else 0.0)
+        elif kind == 'scale':
+            m[0, 0], m[1, 1] = v[0], v[1] if len(v) > 1 else v[0]
+        elif kind == 'rotate':
+            a = math.radians(v[0])
+            m[:2, :2] = [[math.cos(a), -math.sin(a)], [math.sin(a), math.cos(a)]]
+            if len(v) == 3:
+                t = np.eye(3)
+                t[:2, 2] = v[1:]
+                back = np.eye(3)
+                back[:2, 2] = (-v[1], -v[2])
+                m = t @ m @ back
+        elif kind == 'skewX':
+            m[0, 1] = math.tan(math.radians(v[0]))
+        else:
+            m[1, 0] = math.tan(math.radians(v[0]))
+        matrix = matrix @ m
+    return matrix
+
+def _svg_arc(p0, rx, ry, phi, large, sweep_flag, p1, tolerance) -> list:
+    """Arco elíptico de SVG (parametrización por extremos) sin el punto inicial"""
+    if rx == 0 or ry == 0 or p0 == p1:
+        return [p1]
+    rx, ry = abs(rx), abs(ry)
+    cos_p, sin_p = math.cos(math.radians(phi)), math.sin(math.radians(phi))
+    dx, dy = (p0[0] - p1[0]) / 2, (p0[1] - p1[1]) / 2
+    x1 = cos_p * dx + sin_p * dy
+    y1 = -sin_p * dx + cos_p * dy
+    scale = x1 * x1 / (rx * rx) + y1 * y1 / (ry * ry)
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    numerator = rx * rx * ry * ry - rx * rx * y1 * y1 - ry * ry * x1 * x1
+    denominator = rx * rx * y1 * y1 + ry * ry * x1 * x1
+    factor = math.sqrt(max(numerator, 0) / denominator)
+    if large == sweep_flag:
+        factor = -factor
+    cxp, cyp = factor * rx * y1 / ry, -factor * ry * x1 / rx
+    cx = cos_p * cxp - sin_p * cyp + (p0[0] + p1[0]) / 2
+    cy = sin_p * cxp + cos_p * cyp + (p0[1] + p1[1]) / 2
+    start = math.atan2((y1 - cyp) / ry, (x1 - cxp) / rx)
+    end = math.atan2((-y1 - cyp) / ry, (-x1 - cxp) / rx)
+    delta = end - start
+    if sweep_flag and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep_flag and delta > 0:
+        delta -= 2 * math.pi
+    unit = _arc_points(0.0, 0.0, 1.0, start, delta, tolerance)[1:-1]
+    x, y = rx * unit[:, 0], ry * unit[:, 1]
+    points = np.column_stack((cos_p * x - sin_p * y + cx, sin_p * x + cos_p * y + cy))
+    return points.tolist() + [p1]
+
+def _bezier(control, tolerance: float) -> list:
+    """Curva de Bézier (cuadrática o cúbica) sin el punto inicial
+
+    La cantidad de tramos acota la flecha por tolerance veces el largo del
+    polígono de control: flecha <= |B''|máx / (8 n²).
+    """
+    control = np.asarray(control, dtype=float)
+    degree = len(control) - 1
+    second = np.hypot(*np.diff(control, 2, axis=0).T).max()
+    length = np.hypot(*np.diff(control, axis=0).T).sum()
+    if length == 0:
+        return control[-1:].tolist()
+    segments = max(1, math.ceil(math.sqrt(degree * (degree - 1) * second
+                                          / (8 * tolerance * length))))
+    t = np.arange(1, segments + 1)[:, None] / segments
+    if len(control) == 3:
+        p0, p1, p2 = control
+        curve = (1 - t)**2 * p0 + 2 * (1 - t) * t * p1 + t * t * p2
+    else:
+        p0, p1, p2, p3 = control
+        curve = (1 - t)**3 * p0 + 3 * (1 - t)**2 * t * p1 + 3 * (1 - t) * t * t * p2 + t**3 * p3
+    return curve.tolist()
+
+def parse_path(d: str, arc_tolerance: float = DEFAULT_ARC_TOLERANCE
+               ) -> List[Tuple[np.ndarray, bool]]:
+    """Subtrayectos (puntos, cerrado) de un atributo d de <path>"""
+    subpaths: List[Tuple[np.ndarray, bool]] = []
+    tokens = _PATH_TOKEN.findall(d or '')
+    x = y = 0.0                 # punto actual
+    start = (0.0, 0.0)          # inicio del subtrayecto
+    points: list = []
+    control = None              # último punto de control, para S y T
+    last = ''
+    command = None
+    i = 0
+
+    def finish(closed):
+        nonlocal points
+        if len(points) > 1:
+            subpaths.append((np.array(points), closed))
+        points = []
+
+    while i < len(tokens):
+        letter, _ = tokens[i]
+        if letter:
+            command = letter
+            i += 1
+            if command in 'Zz':
+                finish(True)
+                x, y = start
+                control, last = None, 'Z'
+                continue
+        elif command is None:
+            raise ValueError("Trayecto SVG inválido: falta el comando inicial.")
+        elif command in 'Zz':
+            raise ValueError("Trayecto SVG inválido: números después de 'Z'.")
+        upper = command.upper()
+        args: List[float] = []
+        while len(args) < _ARGUMENTS[upper]:
+            if i >= len(tokens) or tokens[i][0]:
+                raise ValueError(f"Trayecto SVG inválido cerca de '{command}'.")
+            text = tokens[i][1]
+            if upper == 'A' and len(args) in (3, 4) and len(text) > 1 and text[0] in '01':
+                # Banderas de arco pegadas al número siguiente ("a5 5 0 0110 0")
+                args.append(float(text[0]))
+                tokens[i] = ('', text[1:])
+                continue
+            args.append(float(text))
+            i += 1
+        dx, dy = (x, y) if command.islower() else (0.0, 0.0)
+        if upper == 'M':
+            finish(False)
+            x, y = start = (dx + args[0], dy + args[1])
+            points = [start]
+            # Pares siguientes a un M son L implícitos
+            command = 'l' if command == 'm' else 'L'
+            control, last = None, 'M'
+            continue
+        if not points:
+            points = [(x, y)]
+        control_next = None
+        if upper == 'L':
+            target = (dx + args[0], dy + args[1])
+            points.append(target)
+        elif upper == 'H':
+            target = (dx + args[0], y)
+            points.append(target)
+        elif upper == 'V':
+            target = (x, dy + args[0])
+            points.append(target)
+        elif upper in 'CS':
+            if upper == 'C':
+                c1 = (dx + args[0], dy + args[1])
+                args = args[2:]
+            else:
+                c1 = (2 * x - control[0], 2 * y - control[1]) if last and last in 'CS' \
+                    else (x, y)
+            control_next = (dx + args[0], dy + args[1])
+            target = (dx + args[2], dy + args[3])
+            points.extend(_bezier([(x, y), c1, control_next, target], arc_tolerance))
+        elif upper in 'QT':
+            if upper == 'Q':
+                control_next = (dx + args[0], dy + args[1])
+                args = args[2:]
+            else:
+                control_next = (2 * x - control[0], 2 * y - control[1]) \
+                    if last and last in 'QT' else (x, y)
+            target = (dx + args[0], dy + args[1])
+            points.extend(_bezier([(x, y), control_next, target], arc_tolerance))
+        else:
+            target = (dx + args[5], dy + args[6])
+            points.extend(_svg_arc((x, y), args[0], args[1], args[2], bool(args[3]),
+                                   bool(args[4]), target, arc_tolerance))
+        control, last = control_next, upper
+        x, y = target
+    finish(False)
+    return subpaths
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+_LABEL = '{http://www.inkscape.org/namespaces/inkscape}label'
+
+@dataclass(frozen=True)
+class _Transform:
+    """Transformación acumulada de un nodo SVG y lo que permite conservar exacto"""
+    matrix: np.ndarray
+    axis_aligned: bool              # los rect siguen siendo rectángulos
+    scale: Optional[float]          # factor de una semejanza (los círculos siguen siéndolo)
+
+    @classmethod
+    def of(cls, matrix: np.ndarray) -> '_Transform':
+        (a, b), (c, d) = matrix[:2, :2].tolist()
+        det = a * d - b * c
+        tol = 1e-12 * max(abs(a), abs(b), abs(c), abs(d))
+        sign = 1.0 if det >= 0 else -1.0
+        similar = abs(a - sign * d) <= tol and abs(b + sign * c) <= tol
+        return cls(matrix, b == 0 and c == 0, math.sqrt(abs(det)) if similar else None)
+
+    def apply(self, points) -> np.ndarray:
+        return np.asarray(points, dtype=float) @ self.matrix[:2, :2].T + self.matrix[:2, 2]
+
+def _length(elem: ET.Element, key: str) -> float:
+    """Longitud de un atributo SVG ignorando la unidad (px, mm, ...)"""
+    match = re.match(_NUMBER, elem.get(key, '').strip())
+    return float(match.group()) if match else 0.0
+
+@instrumented('importar.svg')
+def import_svg(path, calc: Optional[CentroidCalculator] = None, *,
+               hole_layers: Collection[str] = (), winding_holes: bool = True,
+               flip_y: bool = True, arc_tolerance: float = DEFAULT_ARC_TOLERANCE,
+               include_open: bool = False,
+               batch_size: int = DEFAULT_BATCH_SIZE
+               ) -> Tuple[CentroidCalculator, ImportResult]:
+    """Agrega a `calc` (o a una calculadora nueva) las regiones de un SVG
+
+    include_open: trata los subtrayectos sin Z como cerrados (como el relleno de SVG)
+    """
+    calc = CentroidCalculator() if calc is None else calc
+    result = ImportResult()
+    feeder = _Feeder(calc, hole_layers, winding_holes, batch_size, result)
+    base = _Transform.of(np.diag([1.0, -1.0, 1.0]) if flip_y else np.eye(3))
+    # Pila de (elemento, transformación acumulada, capa)
+    stack: List[Tuple[ET.Element, _Transform, str]] = []
+    count = 0
+
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            transform, layer = (stack[-1][1], stack[-1][2]) if stack else (base, '0')
+            if elem.get('transform'):
+                transform = _Transform.of(transform.matrix @ _parse_transform(elem.get('transform')))
+            if _local(elem.tag) == 'g':
+                layer = elem.get(_LABEL) or elem.get('id') or layer
+            stack.append((elem, transform, layer))
+            continue
+
+        _, transform, layer = stack.pop()
+        tag = _local(elem.tag)
+        if tag in ('path', 'polygon', 'polyline', 'rect', 'circle', 'ellipse'):
+            count += 1
+            name = f"{layer}:{elem.get('id') or f'{tag}{count}'}"
+            _svg_element(feeder, tag, elem, transform, name, layer, arc_tolerance,
+                         include_open, result)
+        # Lo ya procesado se desprende del árbol para no acumular memoria
+        elem.clear()
+        if stack:
+            stack[-1][0].remove(elem)
+    feeder.flush()
+    return calc, result
+
+def _svg_element(feeder, tag, elem, transform, name, layer, arc_tolerance, include_open,
+                 result):
+    apply = transform.apply
+    number = lambda key: _length(elem, key)
+    if tag == 'circle' or tag == 'ellipse':
+        cx, cy = number('cx'), number('cy')
+        rx = number('r') if tag == 'circle' else number('rx')
+        ry = number('r') if tag == 'circle' else number('ry')
+        if rx <= 0 or ry <= 0:
+            result.skipped += 1
+        elif rx == ry and transform.scale is not None:
+            (x, y), = apply([[cx, cy]]).tolist()
+            feeder.circle(name, layer, x, y, rx * transform.scale)
+        else:
+            unit = _arc_points(0.0, 0.0, 1.0, 0.0, 2 * math.pi, arc_tolerance)[:-1]
+            feeder.polygon(name, layer, apply(unit * (rx, ry) + (cx, cy)), winding_hole=False)
+    elif tag == 'rect':
+        x, y, w, h = number('x'), number('y'), number('width'), number('height')
+        if w <= 0 or h <= 0:
+            result.skipped += 1
+        elif transform.axis_aligned and not (elem.get('rx') or elem.get('ry')):
+            (x0, y0), (x1, y1) = apply([[x, y], [x + w, y + h]]).tolist()
+            feeder.rectangle(name, layer, (x0 + x1) / 2, (y0 + y1) / 2, abs(x1 - x0),
+                             abs(y1 - y0))
+        else:
+            # Las esquinas redondeadas (rx, ry) se ignoran
+            feeder.polygon(name, layer, apply([[x, y], [x + w, y], [x + w, y + h], [x, y + h]]),
+                           winding_hole=False)
+    elif tag in ('polygon', 'polyline'):
+        points = np.array(_numbers(elem.get('points'))).reshape(-1, 2)
+        if tag == 'polyline' and not include_open and not (
+                len(points) > 2 and (points[0] == points[-1]).all()):
+            result.open_paths += 1
+        else:
+            feeder.polygon(name, layer, apply(points), winding_hole=False)
+    else:
+        subpaths = parse_path(elem.get('d'), arc_tolerance)
+        regions = []
+        for points, closed in subpaths:
+            if closed or include_open or (points[0] == points[-1]).all():
+                regions.append(apply(points))
+            else:
+                result.open_paths += 1
+        if len(regions) == 1:
+            feeder.polygon(name, layer, regions[0], winding_hole=False)
+            return
+        if not regions:
+            return
+        # Sentido de referencia: el del subtrayecto de mayor área
+        counts = [len(points) for points in regions]
+        twice_area = _orientation(np.concatenate(regions),
+                                  np.concatenate(([0], np.cumsum(counts))))
+        outer = np.sign(twice_area[np.argmax(np.abs(twice_area))])
+        for k, points in enumerate(regions):
+            feeder.polygon(f"{name}[{k}]", layer, points,
+                           winding_hole=bool(np.sign(twice_area[k]) == -outer))
+
+def import_drawing(path, calc: Optional[CentroidCalculator] = None, **kwargs
+                   ) -> Tuple[CentroidCalculator, ImportResult]:
+    """Importa un .dxf o .svg según la extensión"""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.dxf':
+        return import_dxf(path, calc, **kwargs)
+    if suffix == '.svg':
+        return import_svg(path, calc, **kwargs)
+    raise ValueError(f"Formato de dibujo no soportado: {suffix}")
@@ -0,0 +1,185 @@
+"""Instrumentación opcional: temporizadores, conteo de llamadas y memoria
+
+Los puntos calientes (ingesta y reducciones de CentroidCalculator, tabla
+resumen, gráfico, evaluación del campo y cuadratura del flujo) están
+marcados con @instrumented o con `with timer(...)`. Mientras el registro
+está desactivado (lo normal) el costo es una comprobación de un booleano.
+
+    import metricas
+    metricas.enable(track_allocations=True)
+    ...  # código a medir
+    print(metricas.REGISTRY.to_prometheus())
+
+También se activa al importar con la variable de entorno CAMPO_METRICS=1
+(o CAMPO_METRICS=alloc para medir además la memoria).
+Con track_allocations se usa tracemalloc para registrar el pico de memoria
+asignada dentro de cada llamada (lo que sí tiene un costo apreciable).
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List
+
+@dataclass
+class TimerStats:
+    """Acumulado de un punto instrumentado"""
+    calls: int = 0
+    total_seconds: float = 0.0
+    min_seconds: float = float('inf')
+    max_seconds: float = 0.0
+    alloc_peak_bytes: int = 0      # máximo pico asignado en una llamada
+    alloc_net_bytes: int = 0       # memoria retenida acumulada al salir
+
+    def record(self, seconds: float, peak: int = 0, net: int = 0):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.min_seconds = min(self.min_seconds, seconds)
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.alloc_peak_bytes = max(self.alloc_peak_bytes, peak)
+        self.alloc_net_bytes += net
+
+class _Timing:
+    """Contexto que mide una sección y la registra al salir"""
+    __slots__ = ('registry', 'name', 'start', 'frame')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.frame = self.registry._enter_allocations()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        peak, net = self.registry._exit_allocations(self.frame)
+        with self.registry._lock:
+            stats = self.registry.timers.get(self.name)
+            if stats is None:
+                stats = self.registry.timers[self.name] = TimerStats()
+            stats.record(elapsed, peak, net)
+        return False
+
+_NULL = contextlib.nullcontext()
+
+class MetricsRegistry:
+    """Registro de métricas por nombre; desactivado por defecto"""
+
+    def __init__(self):
+        self.enabled = False
+        self.track_allocations = False
+        self.timers: Dict[str, TimerStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+    def enable(self, track_allocations: bool = False):
+        self.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.track_allocations = False
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+
+    def timer(self, name: str):
+        """Contexto que mide la sección `name` (no hace nada si está desactivado)"""
+        if not self.enabled:
+            return _NULL
+        return _Timing(self, name)
+
+    # Las llamadas anidadas comparten el pico de tracemalloc: cada marco
+    # guarda (memoria al entrar, pico visto) y al salir lo propaga al padre.
+    def _enter_allocations(self):
+        if not (self.track_allocations and tracemalloc.is_tracing()):
+            return None
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]
+        stack.append(frame)
+        return frame
+
+    def _exit_allocations(self, frame):
+        if frame is None or not tracemalloc.is_tracing():
+            return 0, 0
+        stack = self._local.stack
+        current, peak = tracemalloc.get_traced_memory()
+        stack.pop()
+        top = max(frame[1], peak)
+        if stack:
+            stack[-1][1] = max(stack[-1][1], top)
+        return top - frame[0], current - frame[0]
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Copia de las métricas como diccionarios"""
+        with self._lock:
+            return {name: asdict(stats) for name, stats in sorted(self.timers.items())}
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps({'timestamp': time.time(), 'timers': self.snapshot()}, **kwargs)
+
+    def to_prometheus(self, prefix: str = 'campo') -> str:
+        """Métricas en el formato de texto de Prometheus"""
+        metrics = (
+            ('calls_total', 'counter', 'calls', "Llamadas por punto instrumentado"),
+            ('seconds_total', 'counter', 'total_seconds', "Tiempo acumulado en segundos"),
+            ('seconds_max', 'gauge', 'max_seconds', "Llamada más lenta en segundos"),
+            ('alloc_peak_bytes', 'gauge', 'alloc_peak_bytes', "Pico de memoria asignada"),
+        )
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for suffix, kind, field, help_text in metrics:
+            metric = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, stats in snapshot.items():
+                lines.append(f'{metric}{{name="{name}"}} {stats[field]!r}')
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+def enable(track_allocations: bool = False):
+    """Activa el registro global"""
+    REGISTRY.enable(track_allocations)
+
+def disable():
+    REGISTRY.disable()
+
+def timer(name: str):
+    """Atajo para REGISTRY.timer"""
+    return REGISTRY.timer(name)
+
+def instrumented(name: str) -> Callable[[Callable], Callable]:
+    """Decorador: mide cada llamada a la función con el nombre dado"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return func(*args, **kwargs)
+            with _Timing(REGISTRY, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+if os.environ.get('CAMPO_METRICS', '') not in ('', '0'):
+    enable(track_allocations=os.environ['CAMPO_METRICS'] == 'alloc')
@@ -0,0 +1,230 @@
+"""Potencial y campo de cargas puntuales sobre rejillas 3D grandes
+
+Una rejilla regular se describe solo por sus tres ejes 1D: solo los puntos
+de un bloque de planos x (una "losa") existen a la vez, y se evalúan con el
+núcleo por bloques de campo_cargas. Las losas se escriben directamente en
+archivos .npy abiertos con np.lib.format.open_memmap, y se reparten entre
+procesos, de modo que volúmenes de 512^3 o más no necesitan caber en memoria.
+Los nodos que caen sobre una carga (a min_distance o menos) valen NaN.
+
+Las superficies equipotenciales se extraen del potencial calculado con
+tetraedros marchantes (cada celda se divide en 6 tetraedros), también
+losa por losa.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+import campo_cargas
+
+COMPONENTS = ('potential', 'ex', 'ey', 'ez')
+# Volúmenes (s, ny, nz) en float64 vivos a la vez al evaluar una losa (puntos,
+# campo, potencial y copias); los temporales del núcleo tienen su propio presupuesto
+_TEMPORARIES = 8
+# Tope para los bloques (puntos × cargas) del núcleo: bloques que caben en caché
+# rinden casi el doble que los de DEFAULT_MEMORY_BUDGET
+_KERNEL_BUDGET = 4 * 2**20
+
+@dataclass
+class Grid:
+    """Rejilla regular de shape = (nx, ny, nz) puntos entre lo y hi (inclusive)"""
+    lo: Tuple[float, float, float]
+    hi: Tuple[float, float, float]
+    shape: Tuple[int, int, int]
+
+    def axes(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return tuple(np.linspace(a, b, n) for a, b, n in zip(self.lo, self.hi, self.shape))
+
+    @property
+    def spacing(self) -> np.ndarray:
+        return (np.asarray(self.hi, float) - self.lo) / (np.asarray(self.shape) - 1)
+
+def slab_planes(grid: Grid, memory_budget: int = campo_cargas.DEFAULT_MEMORY_BUDGET) -> int:
+    """Planos x por losa que respetan el presupuesto de memoria"""
+    plane = grid.shape[1] * grid.shape[2] * 8 * _TEMPORARIES
+    return int(min(grid.shape[0], max(1, memory_budget // plane)))
+
+def _singular_nodes(x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                    positions: np.ndarray, min_distance: float) -> np.ndarray:
+    """Máscara (s, ny, nz) de los nodos a min_distance o menos de alguna carga"""
+    mask = np.zeros((len(x), len(y), len(z)), dtype=bool)
+    boxes = [(np.searchsorted(axis, positions[:, k] - min_distance, 'left'),
+              np.searchsorted(axis, positions[:, k] + min_distance, 'right'))
+             for k, axis in enumerate((x, y, z))]
+    # Solo las cargas cuya caja de radio min_distance contiene algún nodo
+    candidates = np.flatnonzero(np.all([hi > lo for lo, hi in boxes], axis=0))
+    for j in candidates:
+        (x0, x1), (y0, y1), (z0, z1) = ((lo[j], hi[j]) for lo, hi in boxes)
+        cx, cy, cz = positions[j]
+        r2 = ((x[x0:x1, None, None] - cx) ** 2 + (y[None, y0:y1, None] - cy) ** 2
+              + (z[None, None, z0:z1] - cz) ** 2)
+        mask[x0:x1, y0:y1, z0:z1] |= r2 <= min_distance * min_distance
+    return mask
+
+def evaluate_slab(grid: Grid, start: int, stop: int, positions: np.ndarray,
+                  charges: np.ndarray, min_distance: float = 0.0,
+                  want_field: bool = True,
+                  memory_budget: int = campo_cargas.DEFAULT_MEMORY_BUDGET
+                  ) -> Dict[str, np.ndarray]:
+    """Potencial (y campo) en los planos x[start:stop], en float64
+
+    Los nodos a min_distance o menos de una carga quedan en NaN.
+    """
+    x, y, z = grid.axes()
+    x = x[start:stop]
+    shape = (len(x), len(y), len(z))
+    points = np.empty(shape + (3,))
+    points[..., 0] = x[:, None, None]
+    points[..., 1] = y[None, :, None]
+    points[..., 2] = z[None, None, :]
+    field, potential = campo_cargas.field_and_potential(
+        points.reshape(-1, 3), positions, charges, min_distance=min_distance,
+        want_field=want_field, memory_budget=min(memory_budget, _KERNEL_BUDGET))
+    del points
+    out = {'potential': potential.reshape(shape)}
+    if want_field:
+        for k, name in enumerate(COMPONENTS[1:]):
+            out[name] = field[:, k].reshape(shape)
+    singular = _singular_nodes(x, y, z, positions, min_distance)
+    if singular.any():
+        for values in out.values():
+            values[singular] = np.nan
+    return out
+
+def _fill_slab(task) -> int:
+    """Se ejecuta en un proceso del pool: evalúa una losa y la escribe en los .npy"""
+    paths, grid, start, stop, positions, charges, min_distance, memory_budget = task
+    values = evaluate_slab(grid, start, stop, positions, charges, min_distance,
+                           want_field=len(paths) > 1, memory_budget=memory_budget)
+    for name, path in paths.items():
+        volume = np.lib.format.open_memmap(path, mode='r+')
+        volume[start:stop] = values[name]
+        volume.flush()
+        del volume
+    return stop - start
+
+def evaluate_grid(grid: Grid, charge_positions, charges=1.0, directory=None, *,
+                  dtype=np.float32, min_distance: float = 0.0, want_field: bool = True,
+                  memory_budget: int = campo_cargas.DEFAULT_MEMORY_BUDGET,
+                  max_workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Evalúa V (y Ex, Ey, Ez) en toda la rejilla
+
+    directory: si se indica, cada componente se escribe en directory/<nombre>.npy
+        losa por losa desde un pool de procesos y se devuelve como memmap de
+        solo lectura; si es None se calcula en memoria en este proceso
+    dtype: tipo de los volúmenes guardados (el cálculo es siempre en float64)
+    memory_budget: bytes de temporales por losa (por proceso)
+    """
+    positions, charges = campo_cargas._as_charges(charge_positions, charges, np.float64)
+    if positions.shape[1] != 3:
+        raise ValueError("La rejilla 3D necesita cargas en 3D.")
+    names = COMPONENTS if want_field else COMPONENTS[:1]
+    planes = slab_planes(grid, memory_budget)
+    slabs = [(i, min(i + planes, grid.shape[0])) for i in range(0, grid.shape[0], planes)]
+
+    if directory is None:
+        volumes = {name: np.empty(grid.shape, dtype=dtype) for name in names}
+        for start, stop in slabs:
+            values = evaluate_slab(grid, start, stop, positions, charges, min_distance,
+                                   want_field, memory_budget)
+            for name in names:
+                volumes[name][start:stop] = values[name]
+        return volumes
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {name: str(directory / f"{name}.npy") for name in names}
+    for path in paths.values():
+        np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=tuple(grid.shape))
+    tasks = [(paths, grid, start, stop, positions, charges, min_distance, memory_budget)
+             for start, stop in slabs]
+    context = multiprocessing.get_context('spawn')
+    workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for _ in pool.map(_fill_slab, tasks):
+            pass
+    return {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+
+# Esquinas de una celda (índice = bx + 2 by + 4 bz) y sus 6 tetraedros sobre la diagonal 0-7
+_CORNERS = np.array([[i & 1, (i >> 1) & 1, (i >> 2) & 1] for i in range(8)])
+_TETRAHEDRA = ((0, 1, 3, 7), (0, 3, 2, 7), (0, 2, 6, 7), (0, 6, 4, 7), (0, 4, 5, 7),
+               (0, 5, 1, 7))
+
+def _tetra_cases():
+    """Triángulos (como ternas de aristas del tetraedro) para cada caso de 4 bits"""
+    cases = {}
+    for code in range(1, 15):
+        inside = [k for k in range(4) if code >> k & 1]
+        outside = [k for k in range(4) if not code >> k & 1]
+        if len(inside) == 2:
+            (a, b), (c, d) = inside, outside
+            cases[code] = [((a, c), (a, d), (b, d)), ((a, c), (b, d), (b, c))]
+        else:
+            odd, = inside if len(inside) == 1 else outside
+            others = [k for k in range(4) if k != odd]
+            cases[code] = [tuple((odd, k) for k in others)]
+    return cases
+
+_TETRA_CASES = _tetra_cases()
+
+def isosurface(volume: np.ndarray, level: float, grid: Grid, planes: int = 32) -> np.ndarray:
+    """Triángulos (T, 3, 3) de la superficie volume = level en coordenadas de la rejilla
+
+    volume puede ser un memmap: se lee de a `planes` planos x (más uno de solape).
+    Las celdas con alguna esquina NaN (nodos sobre una carga) se omiten.
+    """
+    spacing = grid.spacing
+    origin = np.asarray(grid.lo, dtype=float)
+    triangles = []
+    for start in range(0, volume.shape[0] - 1, planes):
+        block = np.asarray(volume[start:start + planes + 1], dtype=np.float64)
+        nx, ny, nz = block.shape
+        if not ((np.nanmin(block) < level) & (np.nanmax(block) >= level)):
+            continue
+        # Valores e índices de las 8 esquinas de cada celda del bloque
+        values = [block[cx:nx - 1 + cx, cy:ny - 1 + cy, cz:nz - 1 + cz].ravel()
+                  for cx, cy, cz in _CORNERS]
+        cells = np.indices((nx - 1, ny - 1, nz - 1)).reshape(3, -1).T + (start, 0, 0)
+        below = [v < level for v in values]
+        finite = np.all([np.isfinite(v) for v in values], axis=0)
+        for tetra in _TETRAHEDRA:
+            code = sum(below[c].astype(np.intp) << k for k, c in enumerate(tetra))
+            for case, tris in _TETRA_CASES.items():
+                hit = np.flatnonzero((code == case) & finite)
+                if not hit.size:
+                    continue
+                base = cells[hit]
+                for tri in tris:
+                    vertices = []
+                    for i, j in tri:
+                        ci, cj = tetra[i], tetra[j]
+                        vi, vj = values[ci][hit], values[cj][hit]
+                        t = (level - vi) / (vj - vi)
+                        index = base + _CORNERS[ci] + t[:, None] * (_CORNERS[cj] - _CORNERS[ci])
+                        vertices.append(origin + index * spacing)
+                    triangles.append(np.stack(vertices, axis=1))
+    if not triangles:
+        return np.empty((0, 3, 3))
+    return np.concatenate(triangles)
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    grid = Grid((-2.0, -2.0, -2.0), (2.0, 2.0, 2.0), (256, 256, 256))
+    charges = [(0.0, 0.0, 0.0), (0.8, 0.0, 0.0)]
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        volumes = evaluate_grid(grid, charges, [1.0, -1.0], tmp)
+        t1 = time.perf_counter()
+        print(f"Rejilla {grid.shape}: {t1 - t0:.2f} s, "
+              f"{sum(v.nbytes for v in volumes.values()) / 2**20:.0f} MiB en disco")
+        for level in (0.5, 1.0, 2.0):
+            tris = isosurface(volumes['potential'], level, grid)
+            print(f"  V = {level:+.1f}: {len(tris)} triángulos")
+        del volumes
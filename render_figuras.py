@@ -0,0 +1,138 @@
+"""Renderizado en paralelo de las figuras de demostraciones.py
+
+Cada figura se dibuja en un proceso propio con su lienzo Agg, de modo que
+las dos figuras (la 3D es la más lenta) se generan a la vez. Antes de
+renderizar se calcula un hash de los parámetros (figura, dpi, formato,
+rasterizado, constantes del problema y código de los módulos que dibujan);
+si coincide con el guardado en el manifiesto y el archivo existe, la
+figura no se vuelve a generar.
+
+    python render_figuras.py                       # PNG a 300 dpi
+    python render_figuras.py --draft               # borrador a 72 dpi
+    python render_figuras.py --format pdf --rasterized
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import demostraciones
+
+# Nombre de la figura -> función de demostraciones que la dibuja
+FIGURAS = {
+    'campo_electrico_casos': 'graficar_campo_2d',
+    'campo_3d_equipotenciales': 'graficar_campo_3d',
+}
+FORMATOS = ('png', 'pdf', 'svg')
+DRAFT_DPI = 72
+MANIFEST = '.render_figuras.json'
+# Módulos cuyo código determina el contenido de las figuras
+MODULOS = ('demostraciones', 'campo_cargas', 'lineas_campo', 'rejilla_3d')
+
+def _module_digest(name: str) -> str:
+    """Hash del archivo fuente de un módulo (sin importarlo)"""
+    with open(importlib.util.find_spec(name).origin, 'rb') as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+@dataclass
+class FigureJob:
+    """Una figura a renderizar"""
+    name: str
+    output: str
+    dpi: int = 300
+    rasterized: bool = False
+
+    def params_hash(self) -> str:
+        """Hash de todo lo que determina el contenido de la figura"""
+        params = {
+            'job': {**asdict(self), 'output': Path(self.output).suffix},
+            'constantes': [demostraciones.S_RADIUS, demostraciones.Q_FUERA,
+                           demostraciones.Q_DENTRO],
+            'codigo': {name: _module_digest(name) for name in MODULOS},
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _render(job: FigureJob) -> str:
+    """Se ejecuta en un proceso del pool: dibuja y guarda una figura con Agg"""
+    plt = demostraciones.cargar_pyplot(headless=True)
+    function = getattr(demostraciones, FIGURAS[job.name])
+    function(plt, output=job.output, dpi=job.dpi, show=False, rasterized=job.rasterized)
+    return job.output
+
+def _load_manifest(directory: Path) -> Dict[str, str]:
+    try:
+        with open(directory / MANIFEST, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def render_figures(names: Optional[Sequence[str]] = None, directory='.', dpi: int = 300,
+                   fmt: str = 'png', rasterized: bool = False, draft: bool = False,
+                   force: bool = False, max_workers: Optional[int] = None) -> List[str]:
+    """Renderiza las figuras pedidas en paralelo y devuelve las rutas generadas
+
+    draft: usa DRAFT_DPI en lugar de dpi
+    force: renderiza aunque el hash de parámetros coincida
+    Las figuras al día se omiten y no aparecen en el resultado.
+    """
+    if fmt not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(directory)
+    jobs = []
+    for name in names or FIGURAS:
+        output = directory / f"{name}.{fmt}"
+        job = FigureJob(name, str(output), DRAFT_DPI if draft else dpi, rasterized)
+        digest = job.params_hash()
+        if not force and output.exists() and manifest.get(output.name) == digest:
+            continue
+        jobs.append((job, digest))
+    if not jobs:
+        return []
+
+    context = multiprocessing.get_context('spawn')
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        outputs = list(pool.map(_render, [job for job, _ in jobs]))
+
+    for job, digest in jobs:
+        manifest[Path(job.output).name] = digest
+    tmp = directory / (MANIFEST + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp, directory / MANIFEST)
+    return outputs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('figuras', nargs='*', metavar='FIGURA',
+                        help="figuras a renderizar (por defecto todas): " + ", ".join(FIGURAS))
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--draft', action='store_true', help=f"borrador a {DRAFT_DPI} dpi")
+    parser.add_argument('--format', dest='fmt', choices=FORMATOS, default='png')
+    parser.add_argument('--rasterized', action='store_true',
+                        help="rasterizar vectores y superficies en pdf/svg")
+    parser.add_argument('--outdir', default='.')
+    parser.add_argument('--jobs', type=int, default=None, help="procesos del pool")
+    parser.add_argument('--force', action='store_true', help="ignorar el hash de parámetros")
+    args = parser.parse_args(argv)
+    unknown = set(args.figuras) - set(FIGURAS)
+    if unknown:
+        parser.error(f"figuras desconocidas: {', '.join(sorted(unknown))}")
+
+    outputs = render_figures(args.figuras, args.outdir, args.dpi, args.fmt, args.rasterized,
+                             args.draft, args.force, args.jobs)
+    for output in outputs:
+        print(f"Generada: {output}")
+    if not outputs:
+        print("Todas las figuras están al día.")
+
+if __name__ == "__main__":
+    main()
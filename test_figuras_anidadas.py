@@ -0,0 +1,47 @@
+import math
+
+import pytest
+
+from centroide_fig_compuesta_v2 import CentroidCalculator
+from figuras_anidadas import Composite, Transform
+
+def _moved_hole() -> CentroidCalculator:
+    """Subfigura de área neta nula: tapa un hueco en x=10 y lo abre en x=20"""
+    calc = CentroidCalculator()
+    calc.add_circle('tapa', 1.0, 10.0, 0.0, is_positive=True)
+    calc.add_circle('hueco', 1.0, 20.0, 0.0, is_positive=False)
+    return calc
+
+def _plate() -> CentroidCalculator:
+    calc = CentroidCalculator()
+    calc.add_rectangle('placa', 40.0, 10.0, 15.0, 0.0)
+    return calc
+
+def _assert_matches_flatten(figure: Composite):
+    expected = figure.flatten().calculate_section_properties()
+    actual = figure.calculate_section_properties()
+    for field in ('area', 'centroid_x', 'centroid_y', 'ix', 'iy', 'ixy', 'i1', 'i2'):
+        assert getattr(actual, field) == pytest.approx(getattr(expected, field),
+                                                       rel=1e-12, abs=1e-9), field
+
+def test_net_zero_subassembly_matches_flatten():
+    figure = Composite()
+    figure.add(_plate())
+    figure.add(_moved_hole())
+    _assert_matches_flatten(figure)
+    # El hueco movido desplaza el centroide hacia la izquierda
+    assert figure.calculate_centroid()[0] == pytest.approx(15.0 - 10 * math.pi / 400)
+
+def test_nested_net_zero_subassembly_with_transforms_matches_flatten():
+    holes = Composite('huecos')
+    holes.add(_moved_hole(), Transform(dx=1.0, dy=2.0, angle=0.3))
+    holes.add(_moved_hole(), Transform(dx=-3.0, dy=1.0, angle=-1.1, mirror=True))
+    holes.add_instances(_moved_hole(), dx=[0.0, 5.0, 7.0], dy=[-2.0, 0.5, 3.0],
+                        angle=[0.0, 2.0, 4.0], is_positive=[True, False, True])
+    assert holes.moments()[0] == 0.0
+
+    figure = Composite()
+    figure.add(_plate(), Transform(dx=1e4, dy=-2e4, angle=0.2))
+    figure.add(holes, Transform(dx=1e4 + 2.0, dy=-2e4, angle=0.7, mirror=True))
+    figure.add(holes, Transform(dx=1e4 - 5.0, dy=-2e4 + 1.0), is_positive=False)
+    _assert_matches_flatten(figure)
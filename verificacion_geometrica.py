@@ -0,0 +1,206 @@
+"""Verificación independiente de figuras compuestas por muestreo cuasi-Monte Carlo
+
+CentroidCalculator suma áreas y momentos con signo y supone que la figura
+es válida: que los huecos (elementos negativos) caen dentro de los sólidos
+y que los sólidos no se superponen. Este módulo reconstruye la geometría
+real de cada elemento (Shape) y estima área y centroide por muestreo de
+Sobol, en bloques de tamaño fijo para acotar la memoria.
+
+Con la función indicadora f(p) = Σ signo_i · [p ∈ elemento_i]:
+- f = 1 dentro de la figura y f = 0 fuera, si la figura es válida
+- f > 1 indica sólidos superpuestos (área contada dos veces)
+- f < 0 indica huecos fuera de los sólidos o huecos superpuestos
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.stats import qmc
+
+from centroide_fig_compuesta_v2 import CentroidCalculator, Shape
+
+# Máximo de pares (arista, muestra) evaluados a la vez en polígonos
+_POLYGON_PAIR_BUDGET = 2**22
+
+@dataclass
+class VerificationReport:
+    """Resultado de comparar CentroidCalculator con el muestreo independiente"""
+    area: float
+    centroid_x: float
+    centroid_y: float
+    estimated_area: float
+    estimated_centroid_x: float
+    estimated_centroid_y: float
+    overlap_area: float        # área estimada con f > 1
+    stray_hole_area: float     # área estimada con f < 0
+    n_samples: int
+    unverifiable: List[str] = field(default_factory=list)
+    messages: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.messages
+
+def shape_bounds(shape: Shape) -> Tuple[float, float, float, float]:
+    """Caja envolvente (xmin, ymin, xmax, ymax) de una geometría"""
+    p = shape.params
+    if shape.kind == 'rectangle':
+        cx, cy, w, h = p
+        return cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2
+    if shape.kind in ('circle', 'semicircle'):
+        cx, cy, r = p[:3]
+        return cx - r, cy - r, cx + r, cy + r
+    if shape.kind == 'polygon':
+        lo = p.min(axis=0)
+        hi = p.max(axis=0)
+        return lo[0], lo[1], hi[0], hi[1]
+    raise ValueError(f"Tipo de geometría desconocido: {shape.kind}")
+
+def _polygon_contains(vertices: np.ndarray, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+    """Regla par-impar: cuenta cruces de cada punto con las aristas a su derecha
+
+    Los puntos se ordenan por y, así cada arista solo se compara con los
+    puntos cuya y cae en su rango [ymin, ymax). Los pares (arista, punto)
+    se generan vectorizados en grupos de a lo sumo _POLYGON_PAIR_BUDGET.
+    """
+    x0, y0 = vertices[:, 0], vertices[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    order = np.argsort(py, kind='stable')
+    sx = px[order]
+    sy = py[order]
+    first = np.searchsorted(sy, np.minimum(y0, y1), side='left')
+    counts = np.searchsorted(sy, np.maximum(y0, y1), side='left') - first
+    crossings = np.zeros(px.size, dtype=np.intp)
+
+    edges = np.flatnonzero(counts)
+    group = (np.cumsum(counts[edges]) - counts[edges]) // _POLYGON_PAIR_BUDGET
+    for chunk in np.split(edges, np.flatnonzero(np.diff(group)) + 1):
+        if not chunk.size:
+            continue
+        lens = counts[chunk]
+        e = np.repeat(chunk, lens)
+        k = np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens) + first[e]
+        qy = sy[k]
+        x_cross = x0[e] + (qy - y0[e]) * (x1[e] - x0[e]) / (y1[e] - y0[e])
+        crossings += np.bincount(k[sx[k] < x_cross], minlength=px.size)
+
+    inside = np.empty(px.size, dtype=bool)
+    inside[order] = crossings % 2 == 1
+    return inside
+
+def shape_contains(shape: Shape, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+    """Máscara booleana de los puntos (px, py) que caen dentro de la geometría"""
+    p = shape.params
+    if shape.kind == 'rectangle':
+        cx, cy, w, h = p
+        return (np.abs(px - cx) <= w / 2) & (np.abs(py - cy) <= h / 2)
+    if shape.kind == 'circle':
+        cx, cy, r = p
+        return (px - cx)**2 + (py - cy)**2 <= r * r
+    if shape.kind == 'semicircle':
+        cx, cy, r, angle = p
+        dx = px - cx
+        dy = py - cy
+        return (dx * dx + dy * dy <= r * r) & (dx * np.cos(angle) + dy * np.sin(angle) >= 0)
+    if shape.kind == 'polygon':
+        return _polygon_contains(p, px, py)
+    raise ValueError(f"Tipo de geometría desconocido: {shape.kind}")
+
+def verify_figure(calc: CentroidCalculator, n_samples: int = 2**20,
+                  chunk_size: int = 2**16, rtol: float = 1e-2,
+                  seed: Optional[int] = 0) -> VerificationReport:
+    """Verifica una figura compuesta con muestreo de Sobol
+
+    n_samples: muestras totales (se redondea a múltiplo de chunk_size)
+    chunk_size: muestras por bloque (potencia de 2); acota la memoria
+    rtol: tolerancia relativa para área y centroide (respecto al tamaño
+          de la caja envolvente en el caso del centroide)
+    Los elementos sin geometría conocida (add_custom_element, add_many sin
+    shapes) se listan en `unverifiable` y se excluyen de la comparación.
+    """
+    elements = calc.elements
+    shapes = [e for e in elements if e.shape is not None]
+    unverifiable = [e.name for e in elements if e.shape is None]
+    if not shapes:
+        raise ValueError("No hay elementos con geometría conocida para verificar.")
+
+    # Referencia: lo que CentroidCalculator calcula con los mismos elementos
+    signed = np.array([e.signed_area for e in shapes])
+    area = float(signed.sum())
+    centroid_x = float(signed @ [e.centroid_x for e in shapes]) / area
+    centroid_y = float(signed @ [e.centroid_y for e in shapes]) / area
+
+    bounds = np.array([shape_bounds(e.shape) for e in shapes])
+    lo = bounds[:, :2].min(axis=0)
+    hi = bounds[:, 2:].max(axis=0)
+    span = hi - lo
+    box_area = float(span[0] * span[1])
+    signs = np.where([e.is_positive for e in shapes], 1, -1)
+
+    n_chunks = max(1, -(-n_samples // chunk_size))
+    sampler = qmc.Sobol(d=2, scramble=True, seed=seed)
+    sums = np.zeros(3)
+    overlap = 0
+    stray = 0
+    for _ in range(n_chunks):
+        pts = lo + sampler.random(chunk_size) * span
+        # Con las muestras ordenadas por x, searchsorted descarta lo lejano
+        order = np.argsort(pts[:, 0], kind='stable')
+        px = pts[order, 0]
+        py = pts[order, 1]
+        f = np.zeros(chunk_size, dtype=np.int32)
+        for (xmin, ymin, xmax, ymax), sign, elem in zip(bounds, signs, shapes):
+            a = np.searchsorted(px, xmin, side='left')
+            b = np.searchsorted(px, xmax, side='right')
+            if a == b:
+                continue
+            sub_y = py[a:b]
+            near = np.flatnonzero((sub_y >= ymin) & (sub_y <= ymax))
+            if not near.size:
+                continue
+            idx = near + a
+            inside = shape_contains(elem.shape, px[idx], py[idx])
+            f[idx[inside]] += sign
+        covered = f >= 1
+        sums += (np.count_nonzero(covered), px[covered].sum(), py[covered].sum())
+        overlap += np.count_nonzero(f > 1)
+        stray += np.count_nonzero(f < 0)
+
+    total = n_chunks * chunk_size
+    estimated_area = box_area * sums[0] / total
+    estimated_cx = sums[1] / sums[0] if sums[0] else float('nan')
+    estimated_cy = sums[2] / sums[0] if sums[0] else float('nan')
+    report = VerificationReport(area, centroid_x, centroid_y, float(estimated_area),
+                                float(estimated_cx), float(estimated_cy),
+                                box_area * int(overlap) / total, box_area * int(stray) / total,
+                                total, unverifiable)
+
+    if overlap:
+        report.messages.append(
+            f"Sólidos superpuestos: ~{report.overlap_area:.4g} de área contada dos veces.")
+    if stray:
+        report.messages.append(
+            f"Huecos fuera de los sólidos: ~{report.stray_hole_area:.4g} de área restada de más.")
+    if abs(estimated_area - area) > rtol * abs(area):
+        report.messages.append(
+            f"Área: calculada {area:.6g}, estimada {estimated_area:.6g}.")
+    size = float(np.hypot(*span))
+    if abs(estimated_cx - centroid_x) > rtol * size or abs(estimated_cy - centroid_y) > rtol * size:
+        report.messages.append(
+            f"Centroide: calculado ({centroid_x:.6g}, {centroid_y:.6g}), "
+            f"estimado ({estimated_cx:.6g}, {estimated_cy:.6g}).")
+    return report
+
+def verify_figures(calcs: Sequence[CentroidCalculator], **kwargs) -> List[VerificationReport]:
+    """Verifica un lote de figuras (mismos parámetros que verify_figure)"""
+    return [verify_figure(calc, **kwargs) for calc in calcs]
+
+if __name__ == "__main__":
+    from centroide_fig_compuesta_v2 import ejemplo_figura_con_calculo_automatico
+
+    report = verify_figure(ejemplo_figura_con_calculo_automatico())
+    print(f"Área calculada: {report.area:.2f}  estimada: {report.estimated_area:.2f}")
+    print(f"Centroide calculado: ({report.centroid_x:.2f}, {report.centroid_y:.2f})  "
+          f"estimado: ({report.estimated_centroid_x:.2f}, {report.estimated_centroid_y:.2f})")
+    for message in report.messages or ["Figura válida."]:
+        print(message)